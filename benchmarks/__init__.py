@@ -0,0 +1,3 @@
+"""
+Benchmarks for xer-reader. See `benchmarks/run.py`.
+"""
@@ -0,0 +1,228 @@
+"""
+Time and memory benchmarks for xer-reader on synthetic XER files.
+
+Each benchmark runs on a synthetic file of every size, where the size is the
+total number of TASK, TASKPRED, TASKRSRC and UDFVALUE rows. Time is measured in
+one run and peak memory with `tracemalloc` in a second run, because tracing
+allocations slows the code down.
+
+    python -m benchmarks.run
+    python -m benchmarks.run --sizes 1000 10000 --only to_dict to_csv --json results.json
+"""
+
+import argparse
+import gc
+import io
+import json
+import tempfile
+import time
+import tracemalloc
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Any, Callable, NamedTuple
+
+from tests.synthetic import write_xer
+from xer_reader import XerReader
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+TABLES_PER_SIZE = 5
+PROJECTS = 5
+
+Setup = Callable[[Path, Path], Callable[[], Any]]
+"""Prepare a benchmark for a file and an output folder, and return the function to measure"""
+
+
+class Result(NamedTuple):
+    """Measurement of a single benchmark on a single file size"""
+
+    benchmark: str
+    """Benchmark name"""
+    rows: int
+    """Number of rows in the synthetic file"""
+    seconds: float
+    """Run time in seconds"""
+    peak_memory: int | None
+    """Peak memory allocated in bytes, or None if not measured"""
+
+
+def _open(file: Path, _: Path) -> Callable[[], Any]:
+    return lambda: XerReader(file).get_table_names()
+
+
+def _to_dict(file: Path, _: Path) -> Callable[[], Any]:
+    return XerReader(file).to_dict
+
+
+def _entries(file: Path, _: Path) -> Callable[[], Any]:
+    tables = XerReader(file).to_dict()
+    return lambda: [table.entries() for table in tables.values()]
+
+
+def _check_errors(file: Path, _: Path) -> Callable[[], Any]:
+    return XerReader(file).check_errors
+
+
+def _delete_tables(file: Path, _: Path) -> Callable[[], Any]:
+    reader = XerReader(file)
+    return lambda: reader.delete_tables("TASKRSRC", "UDFVALUE")
+
+
+def _to_csv(file: Path, out: Path) -> Callable[[], Any]:
+    reader = XerReader(file)
+    return lambda: reader.to_csv(out)
+
+
+def _to_excel(file: Path, out: Path) -> Callable[[], Any]:
+    reader = XerReader(file)
+    return lambda: reader.to_excel(out)
+
+
+def _to_json(file: Path, out: Path) -> Callable[[], Any]:
+    reader = XerReader(file)
+
+    def run() -> None:
+        with out.joinpath("benchmark.json").open("w") as f:
+            reader.to_json(file=f)
+
+    return run
+
+
+def _to_sqlite(file: Path, out: Path) -> Callable[[], Any]:
+    reader = XerReader(file)
+    return lambda: reader.to_sqlite(out.joinpath("benchmark.db"))
+
+
+def _to_parquet(file: Path, out: Path) -> Callable[[], Any]:
+    reader = XerReader(file)
+    return lambda: reader.to_parquet(out)
+
+
+def _to_dataframes(file: Path, _: Path) -> Callable[[], Any]:
+    return XerReader(file).to_dataframes
+
+
+def _extract_projects(file: Path, _: Path) -> Callable[[], Any]:
+    reader = XerReader(file)
+    return lambda: reader.extract_projects(["100"], io.BytesIO())
+
+
+BENCHMARKS: dict[str, Setup] = {
+    "open": _open,
+    "to_dict": _to_dict,
+    "entries": _entries,
+    "check_errors": _check_errors,
+    "delete_tables": _delete_tables,
+    "to_csv": _to_csv,
+    "to_excel": _to_excel,
+    "to_json": _to_json,
+    "to_sqlite": _to_sqlite,
+    "to_parquet": _to_parquet,
+    "to_dataframes": _to_dataframes,
+    "extract_projects": _extract_projects,
+}
+
+OPTIONAL_DEPENDENCIES = {"to_parquet": "pyarrow", "to_dataframes": "pandas"}
+
+
+def measure(setup: Setup, file: Path, out: Path, memory: bool = True) -> Result:
+    """Measure the run time and peak memory of a benchmark.
+
+    Args:
+        setup (Setup): benchmark setup
+        file (Path): XER file
+        out (Path): folder for exported files
+        memory (bool, optional): measure peak memory in a second run. [Default is True]
+
+    Returns:
+        Result: measurement, with the benchmark name and rows left blank
+    """
+    func = setup(file, out)
+    gc.collect()
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+
+    peak_memory = None
+    if memory:
+        func = setup(file, out)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            func()
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return Result("", 0, seconds, peak_memory)
+
+
+def run(
+    sizes: list[int] = DEFAULT_SIZES,
+    benchmarks: list[str] | None = None,
+    memory: bool = True,
+    report: Callable[[Result], None] | None = None,
+) -> list[Result]:
+    """Run the benchmarks on synthetic files of each size.
+
+    Args:
+        sizes (list[int], optional): total rows of each synthetic file. [Default is 1k to 1M]
+        benchmarks (list[str] | None, optional): names of the benchmarks to run. [Default is all]
+        memory (bool, optional): measure peak memory. [Default is True]
+        report (Callable[[Result], None] | None, optional): called with each result as it is measured. [Default is None]
+
+    Returns:
+        list[Result]: measurements
+    """
+    names = benchmarks or [
+        name
+        for name in BENCHMARKS
+        if name not in OPTIONAL_DEPENDENCIES or find_spec(OPTIONAL_DEPENDENCIES[name])
+    ]
+    results = []
+    with tempfile.TemporaryDirectory() as temp:
+        folder = Path(temp)
+        for size in sizes:
+            file = write_xer(
+                folder.joinpath(f"synthetic_{size}.xer"),
+                projects=PROJECTS,
+                tasks=max(size // TABLES_PER_SIZE, 1),
+            )
+            out = folder.joinpath(f"out_{size}")
+            out.mkdir()
+            for name in names:
+                result = measure(BENCHMARKS[name], file, out, memory)
+                result = result._replace(benchmark=name, rows=size)
+                results.append(result)
+                if report:
+                    report(result)
+    return results
+
+
+def _print_result(result: Result) -> None:
+    memory = (
+        f"{result.peak_memory / 2**20:10.1f} MiB"
+        if result.peak_memory is not None
+        else ""
+    )
+    print(f"{result.benchmark:<18}{result.rows:>10,}{result.seconds:>10.3f} s{memory}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS))
+    parser.add_argument(
+        "--no-memory", action="store_true", help="skip the peak memory run"
+    )
+    parser.add_argument("--json", type=Path, help="write the results to a json file")
+    args = parser.parse_args()
+
+    print(f"{'benchmark':<18}{'rows':>10}{'time':>12}{'peak memory':>14}")
+    results = run(args.sizes, args.only, not args.no_memory, _print_result)
+    if args.json:
+        args.json.write_text(
+            json.dumps([result._asdict() for result in results], indent=2)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import subprocess
+import sys
 
 
 def test():
@@ -6,4 +7,12 @@ def test():
     Run all unittests. Equivalent to:
     `poetry run python -u -m unittest discover`
     """
-    subprocess.run(["python", "-u", "-m", "unittest", "discover"])
\ No newline at end of file
+    subprocess.run(["python", "-u", "-m", "unittest", "discover"])
+
+
+def bench():
+    """
+    Run the benchmarks on synthetic XER files. Equivalent to:
+    `poetry run python -u -m benchmarks.run`
+    """
+    subprocess.run(["python", "-u", "-m", "benchmarks.run", *sys.argv[1:]])
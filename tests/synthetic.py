@@ -0,0 +1,441 @@
+"""
+Synthetic XER file generator for the unittests and benchmarks.
+
+Generates valid XER files with a configurable number of projects, activities,
+activity code assignments, relationships, resource assignments and UDF values. Table names and keys are
+taken from `table_data`, and every foreign key points to an existing row, so
+`XerReader.check_errors` finds no errors. Output is deterministic for a seed.
+"""
+
+import random
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from xer_reader.src.reader import XerReader
+from xer_reader.src.table_data import table_data
+
+HEADER = [
+    "ERMHDR",
+    "19.12",
+    "2024-05-01",
+    "Project",
+    "admin",
+    "Admin User",
+    "dbxDatabaseNoName",
+    "Project Management",
+    "USD",
+]
+
+TABLES: dict[str, list[str]] = {
+    "CURRTYPE": [
+        "curr_id",
+        "decimal_digit_cnt",
+        "curr_symbol",
+        "decimal_symbol",
+        "digit_group_symbol",
+        "curr_type",
+        "curr_short_name",
+    ],
+    "ACTVTYPE": [
+        "actv_code_type_id",
+        "actv_short_len",
+        "seq_num",
+        "actv_code_type",
+        "proj_id",
+        "wbs_id",
+        "actv_code_type_scope",
+    ],
+    "CALENDAR": [
+        "clndr_id",
+        "default_flag",
+        "clndr_name",
+        "proj_id",
+        "base_clndr_id",
+        "last_chng_date",
+        "clndr_type",
+        "day_hr_cnt",
+        "week_hr_cnt",
+    ],
+    "PROJECT": [
+        "proj_id",
+        "fy_start_month_num",
+        "clndr_id",
+        "proj_short_name",
+        "plan_start_date",
+        "plan_end_date",
+        "last_recalc_date",
+        "sum_base_proj_id",
+    ],
+    "ACTVCODE": [
+        "actv_code_id",
+        "parent_actv_code_id",
+        "actv_code_type_id",
+        "actv_code_name",
+        "short_name",
+        "seq_num",
+    ],
+    "PROJWBS": [
+        "wbs_id",
+        "proj_id",
+        "seq_num",
+        "proj_node_flag",
+        "status_code",
+        "wbs_short_name",
+        "wbs_name",
+        "parent_wbs_id",
+    ],
+    "RSRC": [
+        "rsrc_id",
+        "parent_rsrc_id",
+        "clndr_id",
+        "rsrc_short_name",
+        "rsrc_name",
+        "rsrc_type",
+    ],
+    "TASK": [
+        "task_id",
+        "proj_id",
+        "wbs_id",
+        "clndr_id",
+        "phys_complete_pct",
+        "rev_fdbk_flag",
+        "task_type",
+        "duration_type",
+        "status_code",
+        "task_code",
+        "task_name",
+        "remain_drtn_hr_cnt",
+        "target_drtn_hr_cnt",
+        "total_float_hr_cnt",
+        "act_start_date",
+        "act_end_date",
+        "early_start_date",
+        "early_end_date",
+        "target_start_date",
+        "target_end_date",
+        "driving_path_flag",
+    ],
+    "TASKACTV": [
+        "task_id",
+        "actv_code_type_id",
+        "actv_code_id",
+        "proj_id",
+    ],
+    "TASKPRED": [
+        "task_pred_id",
+        "task_id",
+        "pred_task_id",
+        "proj_id",
+        "pred_proj_id",
+        "pred_type",
+        "lag_hr_cnt",
+    ],
+    "TASKRSRC": [
+        "taskrsrc_id",
+        "task_id",
+        "proj_id",
+        "rsrc_id",
+        "remain_qty",
+        "target_qty",
+        "target_cost",
+        "act_reg_qty",
+        "target_start_date",
+        "target_end_date",
+    ],
+    "UDFTYPE": [
+        "udf_type_id",
+        "table_name",
+        "udf_type_name",
+        "udf_type_label",
+        "logical_data_type",
+    ],
+    "UDFVALUE": [
+        "udf_type_id",
+        "fk_id",
+        "proj_id",
+        "udf_date",
+        "udf_number",
+        "udf_text",
+    ],
+}
+
+WBS_PER_PROJECT = 10
+GLOBAL_CODES = ["Design", "Build", "Commission"]
+PROJECT_CODES = ["North", "South"]
+STATUS_CODES = ["TK_NotStart", "TK_Active", "TK_Complete"]
+PRED_TYPES = ["PR_FS", "PR_FS", "PR_FS", "PR_SS", "PR_FF"]
+
+
+def write_xer(
+    file: str | Path,
+    projects: int = 1,
+    tasks: int = 1000,
+    relationships: int | None = None,
+    assignments: int | None = None,
+    udf_values: int | None = None,
+    activity_codes: int | None = None,
+    seed: int = 0,
+    crlf: bool = True,
+) -> Path:
+    """Write a synthetic XER file.
+
+    Args:
+        file (str | Path): path of the XER file
+        projects (int, optional): number of projects. [Default is 1]
+        tasks (int, optional): number of TASK rows. [Default is 1000]
+        relationships (int | None, optional): number of TASKPRED rows. [Default is `tasks`]
+        assignments (int | None, optional): number of TASKRSRC rows. [Default is `tasks`]
+        udf_values (int | None, optional): number of UDFVALUE rows, at most one per activity. [Default is `tasks`]
+        activity_codes (int | None, optional): number of TASKACTV rows, at most one per activity. [Default is `tasks`]
+        seed (int, optional): random seed. [Default is 0]
+        crlf (bool, optional): use Windows line endings like P6. [Default is True]
+
+    Returns:
+        Path: path of the XER file
+    """
+    generator = _Generator(projects, tasks, seed)
+    rows = {
+        "CURRTYPE": [["1", "2", "$", ".", ",", "US Dollar", "USD"]],
+        "ACTVTYPE": generator.activity_code_types(),
+        "CALENDAR": generator.calendars(),
+        "PROJECT": generator.projects(),
+        "ACTVCODE": generator.activity_code_values(),
+        "PROJWBS": generator.wbs(),
+        "RSRC": generator.resources(),
+        "TASK": generator.tasks(),
+        "TASKACTV": generator.task_activity_codes(
+            tasks if activity_codes is None else activity_codes
+        ),
+        "TASKPRED": generator.relationships(
+            tasks if relationships is None else relationships
+        ),
+        "TASKRSRC": generator.assignments(
+            tasks if assignments is None else assignments
+        ),
+        "UDFTYPE": [["1", "TASK", "user_field_1", "Comments", "FT_TEXT"]],
+        "UDFVALUE": generator.udf_values(tasks if udf_values is None else udf_values),
+    }
+
+    newline = "\r\n" if crlf else "\n"
+    path = Path(file)
+    with path.open("w", encoding=XerReader.CODEC, newline="") as f:
+        f.write("\t".join(HEADER) + newline)
+        for name, labels in TABLES.items():
+            if labels[0] != (table_data[name]["key"] or labels[0]):
+                raise ValueError(f"First label of {name} must be its key")
+            f.write(f"%T\t{name}{newline}%F\t" + "\t".join(labels) + newline)
+            f.writelines(_lines(rows[name], newline))
+        f.write(f"%E{newline}")
+    return path
+
+
+def synthetic_files(directory: str | Path) -> list[Path]:
+    """Write a small set of synthetic XER files for the unittests.
+
+    Args:
+        directory (str | Path): folder to write the files to
+
+    Returns:
+        list[Path]: paths of the XER files
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    return [
+        write_xer(directory.joinpath("synthetic_single.xer"), 1, 200, seed=1),
+        write_xer(
+            directory.joinpath("synthetic_multi.xer"), 3, 300, seed=2, crlf=False
+        ),
+    ]
+
+
+def _lines(rows: Iterable[list[str]], newline: str) -> Iterator[str]:
+    for row in rows:
+        yield "%R\t" + "\t".join(row) + newline
+
+
+class _Generator:
+    """Row generators sharing the ids of the generated projects and activities"""
+
+    def __init__(self, projects: int, tasks: int, seed: int) -> None:
+        self.random = random.Random(seed)
+        self.project_ids = [str(100 + p) for p in range(projects)]
+        self.task_count = tasks
+
+    def _project(self, row: int) -> int:
+        return row % len(self.project_ids)
+
+    def _task_id(self, project: int, number: int) -> str:
+        # Activities are assigned to projects in turn
+        return str(10_000 + number * len(self.project_ids) + project)
+
+    def calendars(self) -> list[list[str]]:
+        return [
+            [
+                "1",
+                "Y",
+                "Standard 5 Day",
+                "",
+                "",
+                "2024-01-01 00:00",
+                "CA_Base",
+                "8",
+                "40",
+            ],
+            ["2", "N", "7 Day", "", "", "2024-01-01 00:00", "CA_Base", "8", "56"],
+        ] + [
+            [str(10 + p), "N", f"Project {proj_id}", proj_id, "1", "2024-01-02 00:00"]
+            + ["CA_Project", "10", "50"]
+            for p, proj_id in enumerate(self.project_ids)
+        ]
+
+    def activity_code_types(self) -> list[list[str]]:
+        # One global code type, and a code type for each project
+        return [["1", "10", "1", "Phase", "", "", "AS_Global"]] + [
+            [
+                str(10 + p),
+                "10",
+                str(2 + p),
+                f"Area {proj_id}",
+                proj_id,
+                "",
+                "AS_Project",
+            ]
+            for p, proj_id in enumerate(self.project_ids)
+        ]
+
+    def activity_code_values(self) -> list[list[str]]:
+        rows = [
+            [str(1 + n), "", "1", name, name[:3].upper(), str(n)]
+            for n, name in enumerate(GLOBAL_CODES)
+        ]
+        for p, proj_id in enumerate(self.project_ids):
+            # A parent code with a child code for each area
+            root = 100 + p * 10
+            rows.append([str(root), "", str(10 + p), proj_id, f"P{proj_id}", "0"])
+            rows.extend(
+                [str(root + 1 + n), str(root), str(10 + p), name, name[0], str(1 + n)]
+                for n, name in enumerate(PROJECT_CODES)
+            )
+        return rows
+
+    def projects(self) -> list[list[str]]:
+        return [
+            [proj_id, "1", "1", f"PRJ-{proj_id}", "2024-01-01 08:00"]
+            + ["2025-06-30 17:00", "2024-04-30 17:00", ""]
+            for proj_id in self.project_ids
+        ]
+
+    def wbs(self) -> list[list[str]]:
+        rows = []
+        for p, proj_id in enumerate(self.project_ids):
+            root = str(1000 + p * WBS_PER_PROJECT)
+            rows.append([root, proj_id, "0", "Y", "WS_Open", proj_id, proj_id, ""])
+            for n in range(1, WBS_PER_PROJECT):
+                rows.append(
+                    [str(int(root) + n), proj_id, str(n), "N", "WS_Open"]
+                    + [f"W{n}", f"Work Package {n}", root]
+                )
+        return rows
+
+    def resources(self) -> list[list[str]]:
+        return [
+            ["1", "", "1", "LAB", "Labor", "RT_Labor"],
+            ["2", "1", "1", "CREW", "Crew", "RT_Labor"],
+            ["3", "", "2", "EQ", "Equipment", "RT_Equip"],
+            ["4", "", "1", "MAT", "Material", "RT_Mat"],
+        ]
+
+    def tasks(self) -> Iterator[list[str]]:
+        rand = self.random
+        for row in range(self.task_count):
+            p, number = self._project(row), row // len(self.project_ids)
+            status = rand.choice(STATUS_CODES)
+            duration = rand.choice(["0", "8", "16", "40", "80", "120", "37.5"])
+            month, day = rand.randint(1, 12), rand.randint(10, 28)
+            start = f"2024-{month:02d}-{day:02d} 08:00"
+            finish = f"2024-{month:02d}-{day:02d} 17:00"
+            yield [
+                self._task_id(p, number),
+                self.project_ids[p],
+                str(1000 + p * WBS_PER_PROJECT + rand.randint(1, WBS_PER_PROJECT - 1)),
+                rand.choice(["1", "2", str(10 + p)]),
+                "100" if status == "TK_Complete" else str(rand.randint(0, 99)),
+                rand.choice(["Y", "N"]),
+                "TT_Task",
+                "DT_FixedDUR2",
+                status,
+                f"A{number:06d}",
+                f"Activity {number} of project {self.project_ids[p]}",
+                "0" if status == "TK_Complete" else duration,
+                duration,
+                str(rand.randint(-40, 400)),
+                "" if status == "TK_NotStart" else start,
+                finish if status == "TK_Complete" else "",
+                start,
+                finish,
+                start,
+                finish,
+                rand.choice(["Y", "N", "N", "N"]),
+            ]
+
+    def task_activity_codes(self, count: int) -> Iterator[list[str]]:
+        # Activities take a global code and a project code in turn
+        for row in range(min(count, self.task_count)):
+            p, number = self._project(row), row // len(self.project_ids)
+            if number % 2:
+                type_id = str(10 + p)
+                code_id = str(100 + p * 10 + 1 + number // 2 % len(PROJECT_CODES))
+            else:
+                type_id, code_id = "1", str(1 + number // 2 % len(GLOBAL_CODES))
+            yield [self._task_id(p, number), type_id, code_id, self.project_ids[p]]
+
+    def relationships(self, count: int) -> Iterator[list[str]]:
+        rand = self.random
+        projects = len(self.project_ids)
+        per_project = max(self.task_count // projects, 1)
+        for row in range(count if per_project > 1 else 0):
+            p = self._project(row)
+            successor = rand.randint(1, per_project - 1)
+            predecessor = rand.randint(0, successor - 1)
+            yield [
+                str(50_000 + row),
+                self._task_id(p, successor),
+                self._task_id(p, predecessor),
+                self.project_ids[p],
+                self.project_ids[p],
+                rand.choice(PRED_TYPES),
+                rand.choice(["0", "0", "0", "8", "-8"]),
+            ]
+
+    def assignments(self, count: int) -> Iterator[list[str]]:
+        rand = self.random
+        for row in range(count if self.task_count else 0):
+            task = rand.randrange(self.task_count)
+            p = self._project(task)
+            qty = rand.choice(["8", "16", "40", "12.5"])
+            month = rand.randint(1, 12)
+            yield [
+                str(200_000 + row),
+                self._task_id(p, task // len(self.project_ids)),
+                self.project_ids[p],
+                rand.choice(["1", "2", "3", "4"]),
+                qty,
+                qty,
+                f"{rand.randint(100, 100_000)}.{rand.randint(0, 99):02d}",
+                rand.choice(["0", "4", "8"]),
+                f"2024-{month:02d}-10 08:00",
+                f"2024-{month:02d}-20 17:00",
+            ]
+
+    def udf_values(self, count: int) -> Iterator[list[str]]:
+        rand = self.random
+        for row in range(min(count, self.task_count)):
+            p = self._project(row)
+            yield [
+                "1",
+                self._task_id(p, row // len(self.project_ids)),
+                self.project_ids[p],
+                "",
+                "",
+                rand.choice(["On hold", "Critical", "Review", "Long lead item"]),
+            ]
@@ -2,25 +2,64 @@
 Unittests for xer-reader.
 
 Setup the config.py file - follow instructions in config_template.py
+Without a config.py file, the tests run on synthetic files from synthetic.py.
 
 Each unittest will run through all .xer file in the specified directory,
 create an instance of XerReader, and run the assertion tests.
 """
 
+import asyncio
+import csv
+import gzip
+import io
+import json
 import re
+import sqlite3
+import tempfile
 import unittest
+from array import array
 from datetime import datetime
+from importlib.util import find_spec
 from pathlib import Path
 
+from openpyxl import load_workbook
 from tqdm import tqdm
 
-import tests.config as config
+try:
+    import tests.config as config
+except ImportError:
+    # No folder of real XER files, so the tests run on synthetic files
+    config = None
+
+from tests.synthetic import synthetic_files, write_xer
+from xer_reader.src.aio import AsyncXerReader
+from xer_reader.src.arrow import table_to_arrow
+from xer_reader.src.cache import XerCache
+from xer_reader.src.instrument import ProfileCollector
+from xer_reader.src.json_writer import write_json
 from xer_reader.src.reader import XerReader
+from xer_reader.src.sqlite_writer import write_sqlite
+from xer_reader.src.stream import StreamTable
+from xer_reader.src.table import XerTable
 
 date_format = "%Y-%m-%d"
 
 
+class AsyncUpload:
+    """Upload with an async read method, like FastAPI's UploadFile"""
+
+    def __init__(self, file: Path) -> None:
+        self.filename = file.name
+        self._file = io.BytesIO(file.read_bytes())
+
+    async def read(self, size: int = -1) -> bytes:
+        return self._file.read(size)
+
+
 def get_xer_files() -> list:
+    if config is None:
+        return synthetic_files(Path(tempfile.gettempdir(), "xer-reader-tests"))
+
     # Pull location of xer files from config file
     xer_file_path = Path(config.directory)
 
@@ -58,6 +97,160 @@ class TestReader(unittest.TestCase):
             for name, table in tables.items():
                 self.assertGreaterEqual(len(table), 1)
 
+    def test_columnar(self):
+        print(f"Running columnar tests on {len(self.files)} .xer files.")
+        for file in tqdm(self.files):
+            tables = XerReader(file).to_dict()
+            for name, table in XerReader(file, columnar=True).to_dict().items():
+                self.assertTrue(table.columnar)
+                self.assertEqual(table.rows, tables[name].rows, name)
+                self.assertEqual(table.entries(), tables[name].entries(), name)
+                for label in table.labels:
+                    self.assertEqual(table[label], tables[name][label], label)
+
+        # Columns with empty values and date columns are stored in typed arrays
+        labels = ["task_id", "remain_qty", "act_start_date", "task_name"]
+        columns = [
+            ["1", "2", "3"],
+            ["", "8.5", "16"],
+            ["2024-01-02 08:00", "", "2024-03-04 17:30"],
+            ["Start", "", "Finish"],
+        ]
+        table = XerTable.from_columns("TASK", labels, columns, columnar=True)
+        for label in labels[:3]:
+            self.assertIsInstance(table._typed_column(label), array, label)
+        self.assertEqual(table.rows, [list(row) for row in zip(*columns)])
+        self.assertEqual(table["remain_qty"], [None, 8.5, 16.0])
+        self.assertEqual(
+            table["act_start_date"],
+            [datetime(2024, 1, 2, 8), None, datetime(2024, 3, 4, 17, 30)],
+        )
+        self.assertEqual(
+            table.column("act_start_date", serialize=True),
+            ["2024-01-02 08:00", None, "2024-03-04 17:30"],
+        )
+        rows = XerTable.from_columns("TASK", labels, columns)
+        self.assertEqual(table.entries(), rows.entries())
+
+    def test_projection(self):
+        print(f"Running projection tests on {len(self.files)} .xer files.")
+        labels = ["task_code", "task_id", "not_a_label", "status_code"]
+        for file in tqdm(self.files):
+            full = XerReader(file)["TASK"]
+            for columnar in (False, True):
+                reader = XerReader(
+                    file,
+                    columnar=columnar,
+                    tables=["project", "task"],
+                    columns={"task": labels},
+                )
+                self.assertEqual(reader.get_table_names(), ["PROJECT", "TASK"])
+                self.assertNotIn("PROJWBS", reader)
+                task = reader["TASK"]
+                self.assertEqual(
+                    task.labels, [label for label in full.labels if label in labels]
+                )
+                for label in task.labels:
+                    self.assertEqual(task[label], full[label])
+                self.assertEqual(len(task.entries()[0]), 3)
+
+            # Exports streamed from the raw text only include the selected columns
+            reader = XerReader(file, tables=["TASK"], columns={"TASK": labels})
+            projected = [label for label in full.labels if label in labels]
+            conn = sqlite3.connect(":memory:")
+            reader.to_sqlite(conn)
+            cursor = conn.execute("SELECT * FROM TASK")
+            self.assertEqual([col[0] for col in cursor.description], projected)
+            self.assertEqual(len(cursor.fetchall()), len(full))
+            conn.close()
+
+            extract = io.BytesIO()
+            reader.extract_projects(full.column("proj_id")[:1], extract)
+            with XerReader(extract.getvalue()) as extracted:
+                self.assertEqual(extracted["TASK"].labels, projected)
+
+            self.assertFalse(reader.diff(reader))
+            task_diff = reader.diff(XerReader(file))["TASK"]
+            self.assertFalse(task_diff.added or task_diff.removed)
+
+            tables = XerReader(file).to_dict(["TASK"], {"TASK": ["task_id"]})
+            self.assertEqual(list(tables), ["TASK"])
+            self.assertEqual(
+                tables["TASK"].rows, [[value] for value in full.raw_column("task_id")]
+            )
+
+        with self.assertRaises(ValueError):
+            XerReader(self.files[0], cache=self.temp_folder, tables=["TASK"])
+
+    def test_where(self):
+        print(f"Running where tests on {len(self.files)} .xer files.")
+        for file in tqdm(self.files):
+            reader = XerReader(file)
+            tasks = reader["TASK"]
+            proj_id = tasks.column("proj_id")[0]
+            statuses = ["TK_Active", "TK_Complete"]
+            expected = [
+                row
+                for row in tasks.rows
+                if row[tasks.labels.index("proj_id")] == str(proj_id)
+                and row[tasks.labels.index("status_code")] in statuses
+            ]
+
+            active = reader.table(
+                "task", where={"proj_id": proj_id, "status_code": statuses}
+            )
+            self.assertEqual(active.rows, expected)
+            self.assertEqual(len(active), len(expected))
+            self.assertIsNot(reader.table("TASK"), active)
+            self.assertEqual(reader.table("TASK").rows, tasks.rows)
+
+            even = reader.table(
+                "TASK",
+                where={"status_code": statuses},
+                predicate=lambda row: row.task_id % 2 == 0,
+            )
+            self.assertEqual(
+                even.rows,
+                [
+                    row
+                    for row in tasks.rows
+                    if row[tasks.labels.index("status_code")] in statuses
+                    and int(row[tasks.labels.index("task_id")]) % 2 == 0
+                ],
+            )
+
+            with self.assertRaises(KeyError):
+                reader.table("TASK", where={"not_a_label": 1})
+
+    def test_records(self):
+        print(f"Running records tests on {len(self.files)} .xer files.")
+        for file in tqdm(self.files):
+            for table in XerReader(file).to_dict().values():
+                for row, entry in zip(table.records(), table.entries()):
+                    self.assertEqual(dict(row), entry)
+                    for label, value in entry.items():
+                        self.assertEqual(getattr(row, label), value)
+
+    def test_table_indexes(self):
+        print(f"Running table index tests on {len(self.files)} .xer files.")
+        for file in tqdm(self.files):
+            for table in XerReader(file).to_dict().values():
+                if table.key:
+                    for entry in table.entries():
+                        row = table.get(entry[table.key])
+                        self.assertEqual(row[table.key], entry[table.key])
+                for label in table.labels:
+                    groups = table.index_by(label)
+                    self.assertEqual(sum(map(len, groups.values())), len(table))
+
+    def test_check_errors(self):
+        print(f"Running check_errors tests on {len(self.files)} .xer files.")
+        for file in tqdm(self.files):
+            reader = XerReader(file)
+            for error in reader.check_errors():
+                self.assertIsInstance(error, str)
+                self.assertNotIn("[None]", error)
+
     def test_delete_table(self):
         print(f"Running delete_table tests on {len(self.files)} .xer files.")
         for file in tqdm(self.files):
@@ -75,6 +268,222 @@ class TestReader(unittest.TestCase):
             self.assertEqual(reader.get_table_str("PROJECT")[:7], "proj_id")
             self.assertEqual(reader.get_table_str("PROJWBS")[:6], "wbs_id")
 
+    def test_diff(self):
+        print(f"Running diff tests on {len(self.files)} .xer files.")
+        for file in tqdm(self.files):
+            reader = XerReader(file)
+            self.assertEqual(reader.diff(XerReader(file)), {})
+
+            # Remove the first task and change the name of the second
+            lines = file.read_bytes().decode(XerReader.CODEC).split("\n")
+            task_table = lines.index(
+                "%T\tTASK" + ("\r" if lines[0].endswith("\r") else "")
+            )
+            name_col = lines[task_table + 1].split("\t").index("task_name")
+            removed = lines.pop(task_table + 2)
+            changed = lines[task_table + 2].split("\t")
+            changed[name_col] = "Changed name"
+            lines[task_table + 2] = "\t".join(changed)
+            other = XerReader("\n".join(lines).encode(XerReader.CODEC))
+
+            diff = reader.diff(other, ["task", "project"])
+            self.assertEqual(list(diff), ["TASK"])
+            self.assertEqual(diff["TASK"].key, ["task_id"])
+            self.assertEqual(diff["TASK"].added, [])
+            self.assertEqual(
+                [row["task_id"] for row in diff["TASK"].removed],
+                [int(removed.split("\t")[1])],
+            )
+            self.assertEqual(diff["TASK"].changed, {int(changed[1]): ["task_name"]})
+
+    def test_extract_projects(self):
+        print(f"Running extract_projects tests on {len(self.files)} .xer files.")
+        for file in tqdm(self.files):
+            reader = XerReader(file)
+            proj_id = reader["PROJECT"]["proj_id"][0]
+            extracted = io.BytesIO()
+            reader.extract_projects([proj_id], extracted)
+
+            project = XerReader(extracted.getvalue())
+            self.assertEqual(project["PROJECT"]["proj_id"], [proj_id])
+            tasks = reader["TASK"]
+            self.assertEqual(
+                project["TASK"].rows,
+                [
+                    values
+                    for values, row in zip(tasks.rows, tasks.records())
+                    if row["proj_id"] == proj_id
+                ],
+            )
+            self.assertEqual(project["CURRTYPE"].rows, reader["CURRTYPE"].rows)
+            if project.has_table("ACTVTYPE"):
+                # Code types of other projects and their values are left out
+                self.assertLessEqual(
+                    set(project["ACTVTYPE"]["proj_id"]), {None, proj_id}
+                )
+            self.assertEqual(project.check_errors(), [])
+
+    def test_get_table_names(self):
+        print(f"Running get_table_names tests on {len(self.files)} .xer files.")
+        for file in tqdm(self.files):
+            reader = XerReader(file)
+            tables = reader.to_dict()
+            for name in reader.get_table_names():
+                self.assertTrue(reader.has_table(name))
+                if name in tables:
+                    self.assertEqual(
+                        reader._index[name].row_count, len(tables[name]), name
+                    )
+
+    def test_table_cache(self):
+        print(f"Running table cache tests on {len(self.files)} .xer files.")
+        for file in tqdm(self.files):
+            reader = XerReader(file)
+            self.assertIs(reader["PROJECT"], reader["project"])
+            self.assertIs(reader.to_dict()["PROJECT"], reader["PROJECT"])
+            with self.assertRaises(KeyError):
+                reader["TEST_TABLE"]
+            table = reader["PROJECT"]
+            reader.clear_cache("PROJECT")
+            self.assertIsNot(reader["PROJECT"], table)
+
+        # Tables without rows are cached too
+        with tempfile.TemporaryDirectory() as temp:
+            file = write_xer(Path(temp, "empty_udf.xer"), udf_values=0)
+            with XerReader(file) as reader:
+                self.assertEqual(len(reader["UDFVALUE"]), 0)
+                self.assertIs(reader["UDFVALUE"], reader["UDFVALUE"])
+
+    def test_read_bytes(self):
+        print(f"Running read bytes tests on {len(self.files)} .xer files.")
+        for file in tqdm(self.files):
+            with XerReader(file) as reader:
+                tables = reader.to_dict()
+                data = reader.data
+            bytes_reader = XerReader(file.read_bytes())
+            self.assertEqual(bytes_reader.export_date, reader.export_date)
+            self.assertEqual(bytes_reader.data, data)
+            for name, table in bytes_reader.to_dict().items():
+                self.assertEqual(table.rows, tables[name].rows)
+
+    def test_read_file_objects(self):
+        print(f"Running file object tests on {len(self.files)} .xer files.")
+        for file in tqdm(self.files):
+            raw = file.read_bytes()
+            with XerReader(file) as reader:
+                tables = reader.to_dict()
+
+            spooled = tempfile.SpooledTemporaryFile(max_size=len(raw) + 1)
+            spooled.write(raw)
+            spooled.seek(0)
+            rolled = tempfile.SpooledTemporaryFile(max_size=1)
+            rolled.write(raw)
+            rolled.seek(0)
+            sources = [
+                bytearray(raw),
+                memoryview(raw),
+                io.BytesIO(raw),
+                spooled,
+                rolled,
+                io.BufferedReader(io.BytesIO(raw)),
+                file.open("rb"),
+            ]
+            for source in sources:
+                with XerReader(source) as source_reader:
+                    if hasattr(source, "close"):
+                        # The reader owns its buffer, so the file can be closed
+                        source.close()
+                    for name, table in source_reader.to_dict().items():
+                        self.assertEqual(table.rows, tables[name].rows)
+
+            shared = io.BytesIO(raw)
+            with XerReader(shared, share_buffer=True) as shared_reader:
+                self.assertIsInstance(shared_reader._buffer, memoryview)
+                self.assertEqual(shared_reader["PROJECT"].rows, tables["PROJECT"].rows)
+            # Closing the reader releases the shared buffer
+            shared.close()
+
+    def test_read_many(self):
+        print(f"Running read_many tests on {len(self.files)} .xer files.")
+        results = XerReader.read_many(self.files, tables=["PROJECT"])
+        self.assertEqual(len(results), len(self.files))
+        for result in results:
+            self.assertIsNone(result.error)
+            self.assertEqual(list(result.tables), ["PROJECT"])
+
+    def test_cache(self):
+        print(f"Running cache tests on {len(self.files)} .xer files.")
+        cache = XerCache(self.temp_folder.joinpath("cache"))
+        try:
+            for file in tqdm(self.files):
+                tables = XerReader(file).to_dict()
+                XerReader(file, cache=cache)
+                reader = XerReader(file, cache=cache)
+                self.assertTrue(reader.cache_hit)
+                for name, table in reader.to_dict().items():
+                    self.assertEqual(table.rows, tables[name].rows)
+        finally:
+            cache.clear()
+            cache.directory.rmdir()
+
+    def test_async_reader(self):
+        print(f"Running AsyncXerReader tests on {len(self.files)} .xer files.")
+
+        async def read(file: Path) -> None:
+            async with await AsyncXerReader.open(AsyncUpload(file)) as reader:
+                self.assertEqual(reader.file_name, file.stem)
+                self.assertIn("TASK", reader)
+                tasks, project = await asyncio.gather(
+                    reader.table("TASK"), reader.table("PROJECT")
+                )
+                with XerReader(file) as expected:
+                    self.assertEqual(tasks.rows, expected["TASK"].rows)
+                    self.assertEqual(project.rows, expected["PROJECT"].rows)
+                    self.assertEqual(
+                        await reader.to_json("PROJECT"), expected.to_json("PROJECT")
+                    )
+
+            with file.open("rb") as f:
+                reader = await AsyncXerReader.open(f)
+                self.assertEqual(reader.file_name, file.stem)
+                self.assertEqual(
+                    await reader.check_errors(), XerReader(file).check_errors()
+                )
+
+        for file in tqdm(self.files):
+            asyncio.run(read(file))
+
+    def test_observer(self):
+        print(f"Running observer tests on {len(self.files)} .xer files.")
+        for file in tqdm(self.files):
+            collector = ProfileCollector()
+            reader = XerReader(file, observer=collector)
+            reader["TASK"].entries()
+            reader.to_json("PROJECT")
+
+            stages = [event.stage for event in collector.events]
+            self.assertEqual(stages[:3], ["read", "index", "parse"])
+            self.assertIn("convert", stages)
+            self.assertEqual(stages.count("export"), 1)
+            parse = next(event for event in collector.events if event.table == "TASK")
+            self.assertEqual(parse.row_count, len(reader["TASK"]))
+            self.assertGreater(parse.byte_count, 0)
+            self.assertIn("TASK", collector.report())
+            self.assertEqual(set(collector.totals()), set(stages))
+
+    def test_stream(self):
+        print(f"Running stream tests on {len(self.files)} .xer files.")
+        for file in tqdm(self.files):
+            reader = XerReader(file)
+            tables = reader.to_dict()
+            names = []
+            for table in XerReader.stream(file):
+                names.append(table.name)
+                if table.name in tables:
+                    self.assertEqual(table.labels, tables[table.name].labels)
+                    self.assertEqual(list(table.rows), tables[table.name].rows)
+            self.assertEqual(names, reader.get_table_names())
+
     def test_to_csv(self):
         print(f"Running to_csv tests on {len(self.files)} .xer files.")
         for file in tqdm(self.files):
@@ -95,6 +504,207 @@ class TestReader(unittest.TestCase):
                 if csv_file.is_file():
                     Path.unlink(csv_file)
 
+    def test_to_csv_compress(self):
+        print(f"Running compressed to_csv tests on {len(self.files)} .xer files.")
+        for file in tqdm(self.files):
+            reader = XerReader(file)
+            if not self.temp_folder.is_dir():
+                Path.mkdir(self.temp_folder)
+
+            reader.to_csv(self.temp_folder, ["PROJECT"], compress=True)
+
+            csv_file = self.temp_folder.joinpath(f"{reader.file_name}_PROJECT.csv.gz")
+            with gzip.open(csv_file, "rt") as f:
+                rows = list(csv.reader(f, delimiter="\t"))
+            self.assertEqual(rows[0], reader["PROJECT"].labels)
+            self.assertEqual(rows[1:], reader["PROJECT"].rows)
+            Path.unlink(csv_file)
+
+    def test_to_excel_row_limit(self):
+        print(f"Running to_excel row limit tests on {len(self.files)} .xer files.")
+        for file in tqdm(self.files):
+            reader = XerReader(file)
+            if not self.temp_folder.is_dir():
+                Path.mkdir(self.temp_folder)
+
+            reader.to_excel(self.temp_folder, ["PROJWBS"], row_limit=1)
+
+            excel_file = self.temp_folder.joinpath(f"{reader.file_name}.xlsx")
+            wb = load_workbook(excel_file, read_only=True)
+            self.assertEqual(wb.sheetnames, ["ERMHDR", "PROJWBS"])
+            rows = list(wb["PROJWBS"].values)
+            self.assertEqual(list(rows[0]), reader["PROJWBS"].labels)
+            self.assertEqual(len(rows), 2)
+            wb.close()
+            Path.unlink(excel_file)
+
+    def test_to_json(self):
+        print(f"Running to_json tests on {len(self.files)} .xer files.")
+        for file in tqdm(self.files):
+            reader = XerReader(file)
+            data = json.loads(reader.to_json("PROJECT", "TASK"))
+            self.assertEqual(list(data[reader.file_name]), ["PROJECT", "TASK"])
+
+            ndjson = io.StringIO()
+            self.assertIsNone(reader.to_json("PROJECT", file=ndjson, ndjson=True))
+            lines = ndjson.getvalue().splitlines()
+            self.assertEqual(len(lines), len(reader["PROJECT"]))
+            for line in lines:
+                self.assertEqual(json.loads(line)["table"], "PROJECT")
+
+        # Repeated keys keep the first position with the last entry's values
+        for columnar in (False, True):
+            table = XerTable(
+                "PROJECT\n%F\tproj_id\tproj_short_name\n"
+                "%R\t1\tA\n%R\t2\tB\n%R\t1\tC",
+                columnar,
+            )
+            output = io.StringIO()
+            write_json(output, "dup.xer", [table])
+            entries = {entry["proj_id"]: entry for entry in table.entries(True)}
+            self.assertEqual(
+                output.getvalue(),
+                json.dumps({"dup.xer": {"PROJECT": entries}}, indent=2),
+            )
+
+    @unittest.skipUnless(find_spec("pyarrow"), "pyarrow is not installed")
+    def test_to_arrow(self):
+        import pyarrow.parquet as pq
+
+        print(f"Running to_arrow tests on {len(self.files)} .xer files.")
+        for file in tqdm(self.files):
+            reader = XerReader(file)
+            tables = reader.to_arrow(["task"])
+            self.assertEqual(list(tables), ["TASK"])
+            task = tables["TASK"]
+            self.assertEqual(task.num_rows, len(reader["TASK"]))
+            self.assertEqual(
+                task.column("task_id").to_pylist(), reader["TASK"]["task_id"]
+            )
+            self.assertEqual(
+                task.column("early_start_date").to_pylist(),
+                reader["TASK"]["early_start_date"],
+            )
+
+            for label in task.column_names:
+                if label.endswith("_hr_cnt"):
+                    self.assertIn(str(task.column(label).type), ("int64", "double"))
+
+            self.temp_folder.mkdir(exist_ok=True)
+            reader.to_parquet(self.temp_folder, ["TASK"])
+            parquet_file = self.temp_folder.joinpath(f"{reader.file_name}_TASK.parquet")
+            self.assertEqual(pq.read_table(parquet_file).to_pylist(), task.to_pylist())
+            parquet_file.unlink()
+
+        # Count columns with fractional values are stored as floats, not text
+        table = XerTable.from_columns(
+            "TASK",
+            ["task_id", "target_drtn_hr_cnt"],
+            [["1", "2", "3"], ["40", "", "40.5"]],
+        )
+        array = table_to_arrow(table).column("target_drtn_hr_cnt")
+        self.assertEqual(str(array.type), "double")
+        self.assertEqual(array.to_pylist(), [40.0, None, 40.5])
+
+    @unittest.skipUnless(find_spec("pandas"), "pandas is not installed")
+    def test_to_dataframes(self):
+        import pandas as pd
+
+        print(f"Running to_dataframes tests on {len(self.files)} .xer files.")
+        for file in tqdm(self.files):
+            for columnar in (False, True):
+                reader = XerReader(file, columnar=columnar)
+                frames = reader.to_dataframes(["task"])
+                self.assertEqual(list(frames), ["TASK"])
+                task, df = reader["TASK"], frames["TASK"]
+                self.assertEqual(list(df.columns), task.labels)
+                self.assertEqual(len(df), len(task))
+                self.assertEqual(str(df["task_id"].dtype), "Int64")
+                self.assertEqual(df["task_id"].tolist(), task["task_id"])
+                dates = df["early_start_date"].dt.to_pydatetime().tolist()
+                self.assertEqual(
+                    [None if date != date else date for date in dates],
+                    task["early_start_date"],
+                )
+
+            # Typed columns of columnar tables give the same DataFrame
+            pd.testing.assert_frame_equal(
+                XerReader(file, columnar=True).to_dataframes(["TASK"])["TASK"],
+                XerReader(file).to_dataframes(["TASK"])["TASK"],
+            )
+
+        # Count columns with fractional values are stored as floats, not text
+        for columnar in (False, True):
+            table = XerTable.from_columns(
+                "TASK",
+                ["task_id", "target_drtn_hr_cnt"],
+                [["1", "2", "3"], ["40", "", "40.5"]],
+                columnar,
+            )
+            column = table.to_dataframe()["target_drtn_hr_cnt"]
+            self.assertEqual(str(column.dtype), "float64")
+            self.assertEqual(column.fillna(-1).tolist(), [40.0, -1, 40.5])
+
+        # Flags missing from short rows are missing values, as in the entries
+        table = XerTable(
+            "PROJECT\n%F\tproj_id\tcheckout_flag\n%R\t1\tY\n%R\t2\n%R\t3\tN"
+        )
+        flags = table.to_dataframe()["checkout_flag"]
+        self.assertEqual(
+            [None if flag is pd.NA else flag for flag in flags],
+            [entry["checkout_flag"] for entry in table.entries()],
+        )
+
+    def test_to_sqlite(self):
+        print(f"Running to_sqlite tests on {len(self.files)} .xer files.")
+        for file in tqdm(self.files):
+            reader = XerReader(file)
+            conn = sqlite3.connect(":memory:")
+            reader.to_sqlite(conn, ["TASK", "PROJWBS"])
+            task = reader["TASK"]
+            rows = conn.execute("SELECT task_id, task_code FROM TASK").fetchall()
+            self.assertEqual(rows, list(zip(task["task_id"], task["task_code"])))
+
+            # Tables are replaced when written again
+            reader.to_sqlite(conn, ["TASK"])
+            count = conn.execute("SELECT COUNT(*) FROM TASK").fetchone()[0]
+            self.assertEqual(count, len(task))
+
+            indexes = {
+                row[0]
+                for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index'"
+                )
+            }
+            self.assertIn("TASK_task_id_idx", indexes)
+            self.assertIn("PROJWBS_proj_id_idx", indexes)
+            conn.close()
+
+            # A failed load leaves the database as it was, in autocommit mode too
+            conn = sqlite3.connect(":memory:", isolation_level=None)
+            reader.to_sqlite(conn, ["PROJECT"])
+
+            def failing_tables():
+                yield StreamTable("PROJECT", ["proj_id"], iter([["1"]]))
+                raise RuntimeError("Load failed")
+
+            with self.assertRaises(RuntimeError):
+                write_sqlite(conn, failing_tables())
+            self.assertFalse(conn.in_transaction)
+            cursor = conn.execute("SELECT * FROM PROJECT")
+            self.assertEqual(
+                [col[0] for col in cursor.description], reader["PROJECT"].labels
+            )
+            self.assertEqual(len(cursor.fetchall()), len(reader["PROJECT"]))
+            conn.close()
+
+            # Tables without any selected columns are skipped
+            conn = sqlite3.connect(":memory:")
+            XerReader(file, tables=["TASK"], columns={"TASK": ["nope"]}).to_sqlite(conn)
+            tables = conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+            self.assertEqual(tables.fetchall(), [])
+            conn.close()
+
     # def test_to_excel(self):
     #     print(f"Running to_excel tests on {len(self.files)} .xer files.")
     #     for file in tqdm(self.files):
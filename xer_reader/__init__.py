@@ -1,4 +1,7 @@
 __version__ = "0.4.0"
 
+from xer_reader.src.aio import AsyncXerReader  # noqa: F401
+from xer_reader.src.cache import XerCache  # noqa: F401
+from xer_reader.src.instrument import ProfileCollector, StageEvent  # noqa: F401
 from xer_reader.src.reader import XerReader  # noqa: F401
-from xer_reader.src.table import XerTable  # noqa: F401
+from xer_reader.src.table import XerRow, XerTable  # noqa: F401
@@ -0,0 +1,200 @@
+"""
+This module contains the `AsyncXerReader` class, an asyncio wrapper around
+`XerReader` for web upload handlers. Uploads are read in async chunks, and
+parsing and exports run in an executor so the event loop is never blocked.
+
+"""
+
+import asyncio
+import inspect
+from concurrent.futures import Executor
+from functools import partial
+from pathlib import Path
+from tempfile import SpooledTemporaryFile
+from typing import TYPE_CHECKING, Any, Callable, TextIO, TypeVar
+
+from xer_reader.src.cache import XerCache
+from xer_reader.src.reader import XerReader
+from xer_reader.src.table import XerRow, XerTable
+
+if TYPE_CHECKING:
+    import sqlite3
+
+    import pandas as pd
+    import pyarrow as pa
+
+READ_CHUNK_SIZE = 2**20
+
+T = TypeVar("T")
+
+
+class AsyncXerReader:
+    """
+    Asyncio wrapper around `XerReader`.
+
+    Create it with `await AsyncXerReader.open(upload)`. Blocking work runs in
+    `executor`, or in the event loop's default executor if it is None.
+    The wrapped `XerReader` is available as `reader` for its attributes and
+    other quick calls.
+    """
+
+    def __init__(self, reader: XerReader, executor: Executor | None = None) -> None:
+        self.reader: XerReader = reader
+        """Wrapped reader"""
+        self.executor: Executor | None = executor
+        """Executor the blocking work runs in"""
+
+    @classmethod
+    async def open(
+        cls,
+        file: Any,
+        columnar: bool = False,
+        cache: XerCache | str | Path | None = None,
+        executor: Executor | None = None,
+    ) -> "AsyncXerReader":
+        """Read and index an XER file without blocking the event loop.
+
+        Args:
+            file (Any): file path, raw contents, or a binary upload with a `read`
+                method. The spooled file of a FastAPI `UploadFile` is read in the
+                executor in one pass; other async `read` methods are awaited in
+                chunks. Blocking files (e.g. Flask `FileStorage`) are read in the executor.
+            columnar (bool, optional): store tables by column. [Default is False]
+            cache (XerCache | str | Path | None, optional): parse cache. [Default is None]
+            executor (Executor | None, optional): executor for blocking work. [Default is the loop's default executor]
+
+        Raises:
+            ValueError: file is not a valid XER file
+
+        Returns:
+            AsyncXerReader: reader with the tables indexed
+        """
+        file_name = ""
+        if not isinstance(file, (str, Path, bytes, bytearray, memoryview)):
+            name = getattr(file, "filename", None) or getattr(file, "name", "")
+            file_name = Path(name).stem if isinstance(name, str) else ""
+            if inspect.iscoroutinefunction(file.read):
+                # FastAPI and Starlette uploads wrap a spooled file that can be
+                # read once into the reader's buffer in the executor
+                if isinstance(getattr(file, "file", None), SpooledTemporaryFile):
+                    file = file.file
+                else:
+                    file = await _read_chunks(file)
+
+        def _open() -> XerReader:
+            reader = XerReader(file, columnar=columnar, cache=cache)
+            # Build the table index while still off the event loop
+            reader.get_table_names()
+            return reader
+
+        reader = await _run(executor, _open)
+        if file_name:
+            reader.file_name = file_name
+        return cls(reader, executor)
+
+    async def __aenter__(self) -> "AsyncXerReader":
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        self.close()
+
+    def __contains__(self, table_name: str) -> bool:
+        return table_name in self.reader
+
+    @property
+    def file_name(self) -> str:
+        """XER file name"""
+        return self.reader.file_name
+
+    def close(self) -> None:
+        """Release the file contents. See `XerReader.close`."""
+        self.reader.close()
+
+    async def table(
+        self,
+        table_name: str,
+        where: dict[str, Any] | None = None,
+        predicate: Callable[[XerRow], bool] | None = None,
+    ) -> XerTable:
+        """Get a parsed table, optionally filtered. See `XerReader.table`."""
+        return await self._run(self.reader.table, table_name, where, predicate)
+
+    async def check_errors(self) -> list[str]:
+        """Check for errors in the XER file. See `XerReader.check_errors`."""
+        return await self._run(self.reader.check_errors)
+
+    async def to_dict(self) -> dict[str, XerTable]:
+        """Parse all tables. See `XerReader.to_dict`."""
+        return await self._run(self.reader.to_dict)
+
+    async def to_arrow(self, table_names: list[str] = []) -> dict[str, "pa.Table"]:
+        """Convert tables to Arrow tables. See `XerReader.to_arrow`."""
+        return await self._run(self.reader.to_arrow, table_names)
+
+    async def to_csv(
+        self,
+        file_directory: str | Path = Path.cwd(),
+        table_names: list[str] = [],
+        delimeter: str = "\t",
+        compress: bool = False,
+        workers: int | None = None,
+    ) -> None:
+        """Generate CSV files. See `XerReader.to_csv`."""
+        await self._run(
+            self.reader.to_csv,
+            file_directory,
+            table_names,
+            delimeter,
+            compress=compress,
+            workers=workers,
+        )
+
+    async def to_dataframes(
+        self, table_names: list[str] = []
+    ) -> dict[str, "pd.DataFrame"]:
+        """Convert tables to pandas DataFrames. See `XerReader.to_dataframes`."""
+        return await self._run(self.reader.to_dataframes, table_names)
+
+    async def to_excel(
+        self,
+        file_directory: str | Path = Path.cwd(),
+        table_names: list[str] = [],
+        row_limit: int | None = None,
+    ) -> None:
+        """Generate an Excel file. See `XerReader.to_excel`."""
+        await self._run(self.reader.to_excel, file_directory, table_names, row_limit)
+
+    async def to_json(
+        self, *tables: str, file: TextIO | None = None, ndjson: bool = False
+    ) -> str | None:
+        """Generate json. See `XerReader.to_json`."""
+        return await self._run(self.reader.to_json, *tables, file=file, ndjson=ndjson)
+
+    async def to_parquet(
+        self, file_directory: str | Path = Path.cwd(), table_names: list[str] = []
+    ) -> None:
+        """Generate Parquet files. See `XerReader.to_parquet`."""
+        await self._run(self.reader.to_parquet, file_directory, table_names)
+
+    async def to_sqlite(
+        self, database: "str | Path | sqlite3.Connection", table_names: list[str] = []
+    ) -> None:
+        """Write tables to a SQLite database. See `XerReader.to_sqlite`.
+        A connection passed in must be usable from the executor threads."""
+        await self._run(self.reader.to_sqlite, database, table_names)
+
+    async def _run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        return await _run(self.executor, func, *args, **kwargs)
+
+
+async def _run(executor: Executor | None, func: Callable[..., T], *args, **kwargs) -> T:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, partial(func, *args, **kwargs))
+
+
+async def _read_chunks(file: Any) -> bytearray:
+    """Read an async file in chunks, yielding to the event loop between them"""
+    contents = bytearray()
+    while chunk := await file.read(READ_CHUNK_SIZE):
+        contents += chunk
+    return contents
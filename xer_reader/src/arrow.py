@@ -0,0 +1,87 @@
+"""
+This module converts tables to Apache Arrow tables for `XerReader.to_arrow`
+and `XerReader.to_parquet`. Column data types are inferred from the XER label
+rules used by `get_converter`, and whole columns are converted at once with
+Arrow compute functions. `pyarrow` is an optional dependency.
+
+"""
+
+from typing import TYPE_CHECKING
+
+from xer_reader.src.table import DATE_HR_FORMAT, XerTable, column_type
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+# Text columns with at most this share of distinct values are dictionary encoded
+DICTIONARY_RATIO = 0.5
+
+
+def import_pyarrow():
+    """Import `pyarrow`, with a helpful message if it is not installed"""
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError(
+            "pyarrow is required for Arrow and Parquet export: "
+            "pip install xer-reader[arrow]"
+        ) from e
+    return pyarrow
+
+
+def table_to_arrow(table: XerTable) -> "pa.Table":
+    """Convert a table to an Arrow table.
+
+    Empty values are stored as nulls. Id and count columns are stored as int64,
+    or float64 if they have fractional values, cost, quantity and duration columns
+    as float64, dates as timestamps and flags as booleans. A column whose values do not match its inferred data type is
+    kept as text.
+
+    Args:
+        table (XerTable): table to convert
+
+    Returns:
+        pa.Table: Arrow table with a column for each label
+    """
+    pa = import_pyarrow()
+    return pa.table(
+        [_to_array(table.raw_column(label), label) for label in table.labels],
+        names=table.labels,
+    )
+
+
+def _to_array(values: list[str], label: str) -> "pa.Array":
+    pa = import_pyarrow()
+    import pyarrow.compute as pc
+
+    text = pa.array(values, pa.string())
+    raw = pc.if_else(pc.equal(text, ""), pa.scalar(None, pa.string()), text)
+    data_type = column_type(label)
+    try:
+        if data_type == "int":
+            try:
+                return pc.cast(raw, pa.int64())
+            except pa.ArrowInvalid:
+                # Hour counts such as `target_drtn_hr_cnt` can be fractional
+                return _to_float(raw)
+        if data_type == "float":
+            return _to_float(raw)
+        if data_type == "date":
+            return pc.strptime(raw, format=DATE_HR_FORMAT, unit="s")
+        if data_type == "flag":
+            return pc.equal(raw, "Y")
+    except pa.ArrowInvalid:
+        # Values do not match the data type, e.g. free text in an id column
+        pass
+
+    if raw.null_count < len(raw) and len(pc.unique(raw)) <= len(raw) * DICTIONARY_RATIO:
+        return pc.dictionary_encode(raw)
+    return raw
+
+
+def _to_float(raw: "pa.Array") -> "pa.Array":
+    pa = import_pyarrow()
+    import pyarrow.compute as pc
+
+    # Decimal commas
+    return pc.cast(pc.replace_substring(raw, ",", "."), pa.float64())
@@ -0,0 +1,85 @@
+"""
+This module contains the process pool used by `XerReader.read_many` to parse
+many XER files in parallel.
+
+"""
+
+import os
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    as_completed,
+    wait,
+)
+from pathlib import Path
+from typing import Callable, Iterable, NamedTuple
+
+from xer_reader.src.table import XerTable
+
+
+class BatchResult(NamedTuple):
+    """Result of reading a single file in a batch"""
+
+    file: str | Path
+    """XER file path"""
+    tables: dict[str, XerTable] | None
+    """Parsed tables, or None if the file could not be read"""
+    error: str | None
+    """Description of the error if the file could not be read"""
+
+
+def read_many(
+    files: Iterable[str | Path],
+    workers: int | None = None,
+    tables: list[str] | None = None,
+    callback: Callable[[BatchResult], None] | None = None,
+) -> list[BatchResult]:
+    """Parse many XER files in a process pool. See `XerReader.read_many`.
+
+    At most two files per worker are in flight at a time, so peak memory is
+    bounded by the number of workers rather than the number of files.
+    """
+    workers = workers or os.cpu_count() or 1
+    names = [name.upper() for name in tables] if tables else None
+    results: list[BatchResult] = []
+
+    def _done(future: Future, file: str | Path) -> None:
+        try:
+            result = future.result()
+        except Exception as e:
+            # The worker process failed, e.g. it ran out of memory
+            result = BatchResult(file, None, f"{type(e).__name__}: {e}")
+        if callback:
+            callback(result)
+        else:
+            results.append(result)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: dict[Future, str | Path] = {}
+        for file in files:
+            if len(pending) >= workers * 2:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    _done(future, pending.pop(future))
+            pending[executor.submit(_read_tables, file, names)] = file
+
+        for future in as_completed(pending):
+            _done(future, pending[future])
+
+    return results
+
+
+def _read_tables(file: str | Path, names: list[str] | None) -> BatchResult:
+    # Imported here to avoid a circular import with the reader module
+    from xer_reader.src.reader import XerReader
+
+    try:
+        with XerReader(file) as reader:
+            if names is None:
+                return BatchResult(file, reader.to_dict(), None)
+            return BatchResult(
+                file, {name: reader[name] for name in names if name in reader}, None
+            )
+    except Exception as e:
+        return BatchResult(file, None, f"{type(e).__name__}: {e}")
@@ -0,0 +1,135 @@
+"""
+This module contains the `XerCache` class, an on-disk cache of parsed tables
+keyed by the content hash of the XER file.
+
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from array import array
+from pathlib import Path
+
+from xer_reader import __version__
+from xer_reader.src.index import Buffer
+from xer_reader.src.table import XerTable
+
+CACHE_SUFFIX = ".xrc"
+
+
+class XerCache:
+    """
+    Store parsed tables on disk so the same XER file does not need to be parsed again.
+
+    Entries are keyed by a hash of the file contents and the library version, and the
+    least recently used entries are removed once the cache grows past `max_size` bytes.
+    Cache files are loaded with `pickle`, so only use a directory you trust.
+    """
+
+    def __init__(self, directory: str | Path, max_size: int = 2**30) -> None:
+        self.directory: Path = Path(directory)
+        """Directory the cache files are stored in"""
+        self.max_size: int = max_size
+        """Maximum total size of the cache files in bytes"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def key(self, buffer: Buffer) -> str:
+        """Get the cache key for the raw contents of an XER file.
+
+        Args:
+            buffer (Buffer): XER file raw contents
+
+        Returns:
+            str: hash of the file contents and library version
+        """
+        digest = hashlib.blake2b(__version__.encode(), digest_size=20)
+        digest.update(buffer)
+        return digest.hexdigest()
+
+    def load(self, key: str, columnar: bool = False) -> dict[str, XerTable] | None:
+        """Load the tables stored under a key.
+
+        Args:
+            key (str): cache key
+            columnar (bool, optional): store the tables by column. [Default is False]
+
+        Returns:
+            dict[str, XerTable] | None: parsed tables, or None if the key is not cached
+        """
+        path = self._path(key)
+        try:
+            with path.open("rb") as f:
+                stored = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Corrupt or incompatible cache file
+            path.unlink(missing_ok=True)
+            return None
+
+        # Mark the entry as recently used
+        os.utime(path)
+        return {
+            name: XerTable.from_columns(name, labels, _decode(columns), columnar)
+            for name, labels, columns in stored
+        }
+
+    def store(self, key: str, tables: dict[str, XerTable]) -> None:
+        """Store tables under a key, then evict the least recently used entries.
+
+        Args:
+            key (str): cache key
+            tables (dict[str, XerTable]): parsed tables
+        """
+        stored = [
+            (
+                name,
+                table.labels,
+                [_encode(table.raw_column(lbl)) for lbl in table.labels],
+            )
+            for name, table in tables.items()
+        ]
+        # Write to a temporary file first so a partial write is never loaded
+        with tempfile.NamedTemporaryFile(
+            dir=self.directory, suffix=".tmp", delete=False
+        ) as f:
+            try:
+                pickle.dump(stored, f, protocol=pickle.HIGHEST_PROTOCOL)
+            except BaseException:
+                f.close()
+                os.unlink(f.name)
+                raise
+        os.replace(f.name, self._path(key))
+        self._evict()
+
+    def clear(self) -> None:
+        """Remove all cache files"""
+        for path in self.directory.glob(f"*{CACHE_SUFFIX}"):
+            path.unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        entries = sorted(
+            ((path.stat(), path) for path in self.directory.glob(f"*{CACHE_SUFFIX}")),
+            key=lambda entry: entry[0].st_mtime,
+        )
+        total = sum(stat.st_size for stat, _ in entries)
+        for stat, path in entries:
+            if total <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            total -= stat.st_size
+
+    def _path(self, key: str) -> Path:
+        return self.directory.joinpath(f"{key}{CACHE_SUFFIX}")
+
+
+def _decode(columns: list[tuple[list[str], array]]) -> list[list[str]]:
+    return [list(map(values.__getitem__, codes)) for values, codes in columns]
+
+
+def _encode(column: list[str]) -> tuple[list[str], array]:
+    """Dictionary encode a column: the distinct values and the code of each value"""
+    distinct: dict[str, int] = {}
+    codes = array("L", [distinct.setdefault(value, len(distinct)) for value in column])
+    return list(distinct), codes
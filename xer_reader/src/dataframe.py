@@ -0,0 +1,109 @@
+"""
+This module converts tables to pandas DataFrames for `XerTable.to_dataframe`
+and `XerReader.to_dataframes`. Each column is converted as a whole, with its
+data type inferred from the XER label rules used by `get_converter`. `pandas`
+is an optional dependency.
+
+"""
+
+from typing import TYPE_CHECKING
+
+from xer_reader.src.table import DATE_HR_FORMAT, MISSING_INT, XerTable, column_type
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Text columns with at most this share of distinct values are stored as categories
+CATEGORY_RATIO = 0.5
+
+
+def import_pandas():
+    """Import `pandas`, with a helpful message if it is not installed"""
+    try:
+        import pandas
+    except ImportError as e:
+        raise ImportError(
+            "pandas is required for DataFrame export: pip install xer-reader[pandas]"
+        ) from e
+    return pandas
+
+
+def table_to_dataframe(table: XerTable) -> "pd.DataFrame":
+    """Convert a table to a pandas DataFrame.
+
+    Empty values are stored as missing values. Id and count columns use the
+    nullable `Int64` dtype, or `float64` if they have fractional values, cost,
+    quantity and duration columns `float64`, dates `datetime64` and flags the
+    nullable `boolean` dtype. Text columns with few distinct values are stored
+    as categories. A column whose values do not match its inferred data type is
+    kept as text.
+
+    Args:
+        table (XerTable): table to convert
+
+    Returns:
+        pd.DataFrame: DataFrame with a column for each label
+    """
+    pd = import_pandas()
+    if table.columnar:
+        columns = {label: _column(table, label) for label in table.labels}
+    else:
+        # Rows are split into columns by pandas, short rows are padded with None
+        raw = pd.DataFrame(table.rows, columns=table.labels, dtype=object)
+        columns = {label: _convert(raw[label], label) for label in table.labels}
+    return pd.DataFrame(columns, columns=table.labels)
+
+
+def _column(table: XerTable, label: str) -> "pd.Series":
+    pd = import_pandas()
+    if (typed := table._typed_column(label)) is not None:
+        # Columnar tables keep numeric and date columns in typed arrays
+        import numpy as np
+
+        data_type = column_type(label)
+        if data_type == "float":
+            return pd.Series(np.array(typed, dtype="float64"), name=label)
+        values = np.array(typed, dtype="int64")
+        if data_type == "date":
+            # Minutes since 1970, where MISSING_INT is read by NumPy as NaT
+            dates = values.astype("datetime64[m]").astype("datetime64[ns]")
+            return pd.Series(dates, name=label)
+        missing = values == MISSING_INT
+        return pd.Series(pd.arrays.IntegerArray(values, missing), name=label)
+    return _convert(pd.Series(table.raw_column(label), dtype=object, name=label), label)
+
+
+def _convert(raw: "pd.Series", label: str) -> "pd.Series":
+    pd = import_pandas()
+    data_type = column_type(label)
+    try:
+        if data_type == "int":
+            try:
+                return pd.to_numeric(raw).astype("Int64")
+            except (TypeError, ValueError):
+                # Hour counts such as `target_drtn_hr_cnt` can be fractional
+                return _to_float(raw)
+        if data_type == "float":
+            return _to_float(raw)
+        if data_type == "date":
+            return pd.to_datetime(raw, format=DATE_HR_FORMAT).astype("datetime64[ns]")
+        if data_type == "flag":
+            # Missing values of short rows are None
+            return (raw == "Y").astype("boolean").mask(raw.isna() | (raw == ""))
+    except (TypeError, ValueError):
+        # Values do not match the data type, e.g. free text in an id column
+        pass
+
+    text = raw.where(raw.notna() & (raw != ""))
+    if text.nunique() <= len(text) * CATEGORY_RATIO:
+        return text.astype("category")
+    return text.astype("string")
+
+
+def _to_float(raw: "pd.Series") -> "pd.Series":
+    pd = import_pandas()
+    try:
+        return pd.to_numeric(raw).astype("float64")
+    except ValueError:
+        # Decimal commas
+        return pd.to_numeric(raw.str.replace(",", ".", regex=False)).astype("float64")
@@ -0,0 +1,127 @@
+"""
+This module compares the rows of a table in two XER files for `XerReader.diff`.
+Rows are matched by key, and the values of matched rows are only compared
+column by column when their fingerprints differ.
+
+"""
+
+from operator import itemgetter
+from typing import Any, Iterable, NamedTuple, Sequence
+
+from xer_reader.src.table import XerRow, get_converter
+from xer_reader.src.table_data import table_data
+
+
+class TableDiff(NamedTuple):
+    """Differences between the rows of a table in two XER files"""
+
+    name: str
+    """Table name"""
+    key: list[str]
+    """Labels of the columns used to match rows"""
+    added: list[XerRow]
+    """Rows only in the other file"""
+    removed: list[XerRow]
+    """Rows only in this file"""
+    changed: dict[Any, list[str]]
+    """Labels of the changed columns, by key value of the changed row"""
+
+
+def diff_table(
+    name: str,
+    old_labels: list[str],
+    old_rows: Iterable[Sequence[str]],
+    new_labels: list[str],
+    new_rows: Iterable[Sequence[str]],
+) -> TableDiff:
+    """Compare the rows of a table in two XER files in linear time.
+
+    Rows are matched by the table's unique key. Tables without a key are matched
+    by all of their `_id` columns, or by the whole row if there are none. Key
+    values are assumed to be unique; if a key repeats, the last row is used.
+
+    Args:
+        name (str): table name
+        old_labels (list[str]): column labels in this file
+        old_rows (Iterable[Sequence[str]]): unparsed rows in this file
+        new_labels (list[str]): column labels in the other file
+        new_rows (Iterable[Sequence[str]]): unparsed rows in the other file
+
+    Returns:
+        TableDiff: added, removed and changed rows
+    """
+    labels = new_labels + [label for label in old_labels if label not in new_labels]
+    if not labels:
+        return TableDiff(name, [], [], [], {})
+
+    key = _key_labels(name, labels)
+    old = _keyed_rows(old_rows, old_labels, labels, key)
+    new = _keyed_rows(new_rows, new_labels, labels, key)
+
+    changed: dict[Any, list[str]] = {}
+    for key_value, (fingerprint, values) in new.items():
+        if (old_row := old.get(key_value)) is None or old_row[0] == fingerprint:
+            continue
+        changed[_convert_key(key, key_value)] = [
+            label
+            for label, old_value, new_value in zip(labels, old_row[1], values)
+            if old_value != new_value
+        ]
+
+    schema = {label: (col, get_converter(label)) for col, label in enumerate(labels)}
+    return TableDiff(
+        name=name,
+        key=key,
+        added=[
+            XerRow(schema, values)
+            for key_value, (_, values) in new.items()
+            if key_value not in old
+        ],
+        removed=[
+            XerRow(schema, values)
+            for key_value, (_, values) in old.items()
+            if key_value not in new
+        ],
+        changed=changed,
+    )
+
+
+def _convert_key(key: list[str], key_value: str | tuple[str, ...]) -> Any:
+    if len(key) == 1:
+        return get_converter(key[0])(key_value)
+    return tuple(get_converter(label)(value) for label, value in zip(key, key_value))
+
+
+def _key_labels(name: str, labels: list[str]) -> list[str]:
+    if (key := table_data.get(name, {}).get("key")) and key in labels:
+        return [key]
+    return [label for label in labels if label.endswith("_id")] or labels
+
+
+def _keyed_rows(
+    rows: Iterable[Sequence[str]],
+    row_labels: list[str],
+    labels: list[str],
+    key: list[str],
+) -> dict[str | tuple[str, ...], tuple[int, tuple[str, ...]]]:
+    """Map the key of each row to a fingerprint of the row and its values,
+    with the values aligned to `labels`"""
+    width = len(labels)
+    if row_labels == labels:
+        align = None
+    else:
+        positions = {label: col for col, label in enumerate(row_labels)}
+        align = [positions.get(label) for label in labels]
+    get_key = itemgetter(*(labels.index(label) for label in key))
+
+    keyed = {}
+    for row in rows:
+        if align is not None:
+            row = [
+                row[col] if col is not None and col < len(row) else "" for col in align
+            ]
+        elif len(row) != width:
+            row = (list(row) + [""] * width)[:width]
+        values = tuple(row)
+        keyed[get_key(values)] = (hash(values), values)
+    return keyed
@@ -0,0 +1,101 @@
+"""
+This module contains the table index used by `XerReader` to locate tables
+in the raw XER data without rescanning the whole file for each lookup.
+
+The index works on the undecoded bytes, so only the table names and column
+labels are decoded while it is built.
+
+"""
+
+import mmap
+import re
+from typing import NamedTuple
+
+Buffer = bytes | bytearray | memoryview | mmap.mmap
+"""Raw XER file contents"""
+
+COUNT_CHUNK_SIZE = 2**20
+LINE_END = re.compile(rb"\r?\n")
+# Anchored on the preceding newline rather than `^` so the regex engine can
+# use a fast literal search. The ERMHDR line always comes before the first table.
+TABLE_MARKER = re.compile(rb"\n%T\t([^\t\r\n]+)")
+END_MARKER = re.compile(rb"\n%E")
+
+
+class TableIndex(NamedTuple):
+    """Location of a single table in the raw XER data"""
+
+    name: str
+    """Table Name"""
+    start: int
+    """Offset of the `%T` line"""
+    body: int
+    """Offset of the `%F` (column labels) line"""
+    end: int
+    """Offset of the next `%T` line or the `%E` line"""
+    labels: list[str]
+    """Column Labels"""
+    row_count: int
+    """Number of `%R` rows in the table"""
+
+
+def index_tables(
+    buffer: Buffer, codec: str, names: set[str] | None = None
+) -> dict[str, TableIndex]:
+    """Build an index of every table in the XER data in a single pass.
+
+    Args:
+        buffer (Buffer): XER file raw contents
+        codec (str): text encoding of the XER file
+        names (set[str] | None, optional): only index these tables. [Default is all tables]
+
+    Returns:
+        dict[str, TableIndex]: table name mapped to its location in `buffer`
+    """
+    starts = [
+        (m.start() + 1, m.end(), m.group(1)) for m in TABLE_MARKER.finditer(buffer)
+    ]
+    if not starts:
+        return {}
+
+    end_of_data = END_MARKER.search(buffer, starts[-1][1])
+    ends = [start for start, *_ in starts[1:]]
+    ends.append(end_of_data.start() + 1 if end_of_data else len(buffer))
+
+    index = {}
+    for (start, name_end, name), end in zip(starts, ends):
+        table_name = name.decode(codec)
+        if names is not None and table_name not in names:
+            continue
+        body = line_end(buffer, name_end, end)
+        labels = str(buffer[body : line_end(buffer, body, end)], codec, "ignore")
+        index[table_name] = TableIndex(
+            name=table_name,
+            start=start,
+            body=body,
+            end=end,
+            labels=labels.rstrip("\r\n").split("\t")[1:],
+            row_count=_count(buffer, b"\n%R\t", body, end),
+        )
+    return index
+
+
+def line_end(buffer: Buffer, start: int, end: int) -> int:
+    """Offset just past the end of the line starting at `start`"""
+    if found := LINE_END.search(buffer, start, end):
+        return found.end()
+    return end
+
+
+def _count(buffer: Buffer, sub: bytes, start: int, end: int) -> int:
+    if isinstance(buffer, (bytes, bytearray)):
+        return buffer.count(sub, start, end)
+    # mmap and memoryview have no count method, so count in copied chunks.
+    # Chunks overlap by one byte less than `sub`, so a match across the end
+    # of a chunk is only counted in the chunk it starts in.
+    count = 0
+    while start < end:
+        chunk_end = min(start + COUNT_CHUNK_SIZE, end)
+        count += bytes(buffer[start : min(chunk_end + len(sub) - 1, end)]).count(sub)
+        start = chunk_end
+    return count
@@ -0,0 +1,136 @@
+"""
+This module contains the stage events reported by `XerReader` when it is given
+an `observer`, and `ProfileCollector`, an observer that collects the events and
+prints a per-table profile.
+
+"""
+
+from collections import defaultdict
+from functools import wraps
+from time import perf_counter
+from typing import Callable, NamedTuple
+
+STAGES = ("read", "cache", "index", "parse", "convert", "export")
+
+
+class StageEvent(NamedTuple):
+    """Timing of a single stage of reading or exporting an XER file"""
+
+    stage: str
+    """Stage name: read, cache, index, parse, convert or export"""
+    seconds: float
+    """Duration of the stage in seconds"""
+    table: str | None = None
+    """Table name, if the stage worked on a single table"""
+    byte_count: int = 0
+    """Number of raw bytes processed"""
+    row_count: int = 0
+    """Number of rows processed"""
+    detail: str = ""
+    """Extra information, such as the name of the exporter"""
+
+
+Observer = Callable[[StageEvent], None]
+"""Function called with each stage event"""
+
+
+def timed_export(method: Callable) -> Callable:
+    """Report the duration of an `XerReader` export method to its observer.
+    Only an attribute check is added when there is no observer."""
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self._observer is None:
+            return method(self, *args, **kwargs)
+        start = perf_counter()
+        result = method(self, *args, **kwargs)
+        self._observer(
+            StageEvent("export", perf_counter() - start, detail=method.__name__)
+        )
+        return result
+
+    return wrapper
+
+
+class ProfileCollector:
+    """
+    Observer that collects stage events and reports where the time went.
+
+    Pass an instance as the `observer` of an `XerReader`, then call `report()`.
+    """
+
+    def __init__(self) -> None:
+        self.events: list[StageEvent] = []
+        """Stage events in the order they were received"""
+
+    def __call__(self, event: StageEvent) -> None:
+        self.events.append(event)
+
+    def clear(self) -> None:
+        """Remove all collected events"""
+        self.events.clear()
+
+    def totals(self) -> dict[str, float]:
+        """Get the total duration of each stage.
+
+        Returns:
+            dict[str, float]: seconds by stage name
+        """
+        totals: dict[str, float] = defaultdict(float)
+        for event in self.events:
+            totals[event.stage] += event.seconds
+        return dict(totals)
+
+    def report(self) -> str:
+        """Build a text report with the totals of each stage, the parse and convert
+        time of each table, and the duration of each export.
+
+        Returns:
+            str: profile report
+        """
+        stages: dict[str, list[float]] = {}
+        tables: dict[str, list[float]] = {}
+        exports: dict[str, list[float]] = {}
+        for event in self.events:
+            stage = stages.setdefault(event.stage, [0.0, 0, 0])
+            _add(stage, event.seconds, event.byte_count, event.row_count)
+            if event.table is not None:
+                table = tables.setdefault(event.table, [0.0, 0.0, 0, 0])
+                table[0 if event.stage == "parse" else 1] += event.seconds
+                table[2] = max(table[2], event.byte_count)
+                table[3] = max(table[3], event.row_count)
+            if event.stage == "export":
+                _add(exports.setdefault(event.detail, [0.0, 0]), event.seconds, 1)
+
+        lines = [f"{'stage':<14}{'seconds':>10}{'bytes':>16}{'rows':>12}"]
+        for name in sorted(stages, key=_stage_order):
+            seconds, byte_count, row_count = stages[name]
+            lines.append(f"{name:<14}{seconds:>10.4f}{byte_count:>16,}{row_count:>12,}")
+
+        if tables:
+            lines += [
+                "",
+                f"{'table':<14}{'parse':>10}{'convert':>10}{'bytes':>16}{'rows':>12}",
+            ]
+            for name, (parse, convert, byte_count, row_count) in sorted(
+                tables.items(), key=lambda item: -(item[1][0] + item[1][1])
+            ):
+                lines.append(
+                    f"{name:<14}{parse:>10.4f}{convert:>10.4f}"
+                    f"{byte_count:>16,}{row_count:>12,}"
+                )
+
+        if exports:
+            lines += ["", f"{'export':<14}{'seconds':>10}{'calls':>8}"]
+            for name, (seconds, calls) in exports.items():
+                lines.append(f"{name:<14}{seconds:>10.4f}{calls:>8}")
+        return "\n".join(lines)
+
+
+def _add(totals: list, *values) -> None:
+    for i, value in enumerate(values):
+        totals[i] += value
+
+
+def _stage_order(stage: str) -> int:
+    return STAGES.index(stage) if stage in STAGES else len(STAGES)
@@ -0,0 +1,86 @@
+"""
+This module contains the incremental JSON and NDJSON writers used by
+`XerReader.to_json`. Entries are encoded one at a time and written to a file
+object, so the whole document is never held in memory.
+
+"""
+
+import json
+from typing import Any, Iterable, Iterator, TextIO
+
+from xer_reader.src.table import XerRow, XerTable
+
+INDENT = 2
+
+
+def write_json(fp: TextIO, file_name: str, tables: Iterable[XerTable]) -> None:
+    """Write tables as an indented JSON document.
+
+    The output matches `json.dumps(..., indent=2)` of a dict of the form
+    `{file_name: {table_name: {key: entry} | [entry]}}`. If a key value
+    repeats, the values of the last entry are written at the first key's position.
+
+    Args:
+        fp (TextIO): writable text file
+        file_name (str): XER file name
+        tables (Iterable[XerTable]): tables to write
+    """
+    fp.write(f"{{\n{_pad(1)}{json.dumps(file_name)}: {{")
+    table_count = 0
+    for table in tables:
+        fp.write(f"{',' if table_count else ''}\n{_pad(2)}{json.dumps(table.name)}: ")
+        table_count += 1
+
+        brackets = "{}" if table.key else "[]"
+        fp.write(brackets[0])
+        entry_count = 0
+        for key, row in _keyed_records(table):
+            prefix = f"{_json_key(key)}: " if table.key else ""
+            entry = json.dumps(dict(row), indent=INDENT).replace("\n", f"\n{_pad(3)}")
+            fp.write(f"{',' if entry_count else ''}\n{_pad(3)}{prefix}{entry}")
+            entry_count += 1
+
+        fp.write(f"\n{_pad(2)}{brackets[1]}" if entry_count else brackets[1])
+
+    fp.write(f"\n{_pad(1)}}}\n}}" if table_count else "}\n}")
+
+
+def write_ndjson(fp: TextIO, tables: Iterable[XerTable]) -> None:
+    """Write one JSON record per line, with the table name attached to each entry.
+
+    Args:
+        fp (TextIO): writable text file
+        tables (Iterable[XerTable]): tables to write
+    """
+    for table in tables:
+        for row in table.records(serialize=True):
+            fp.write(json.dumps({"table": table.name, "data": dict(row)}))
+            fp.write("\n")
+
+
+def _keyed_records(table: XerTable) -> Iterator[tuple[Any, XerRow]]:
+    records = table.records(serialize=True)
+    if not table.key:
+        yield from ((None, row) for row in records)
+        return
+
+    keys = table.column(table.key, serialize=True)
+    # Like a dict built from the rows: first position, last values
+    last = {}
+    for index, key in enumerate(keys):
+        last[key] = index
+    if len(last) == len(keys):
+        yield from zip(keys, records)
+        return
+
+    rows = list(records)
+    yield from ((key, rows[index]) for key, index in last.items())
+
+
+def _json_key(key) -> str:
+    # json.dumps converts dict keys to strings: 1 -> "1", None -> "null"
+    return json.dumps(key if isinstance(key, str) else json.dumps(key))
+
+
+def _pad(level: int) -> str:
+    return " " * (INDENT * level)
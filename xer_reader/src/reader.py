@@ -5,20 +5,48 @@ an XER file exported from Primavera P6.
 """
 
 import csv
-import json
+import gzip
+import io
+import mmap
 import re
+import sqlite3
+import tempfile
+import warnings
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import cached_property
+from itertools import chain, islice
 from pathlib import Path
-from typing import BinaryIO
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, BinaryIO, Callable, Iterable, Iterator, TextIO
 
 from openpyxl import Workbook
-from openpyxl.worksheet.table import Table
-
-from xer_reader.src.table import XerTable, UnrecognizedTable
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.table import Table, TableColumn
+
+from xer_reader.src.arrow import import_pyarrow, table_to_arrow
+from xer_reader.src.batch import BatchResult, read_many
+from xer_reader.src.cache import XerCache
+from xer_reader.src.diff import TableDiff, diff_table
+from xer_reader.src.json_writer import write_json, write_ndjson
+from xer_reader.src.index import Buffer, TableIndex, index_tables, line_end
+from xer_reader.src.instrument import Observer, StageEvent, timed_export
+from xer_reader.src.sqlite_writer import write_sqlite
+from xer_reader.src.stream import StreamTable, stream_tables
+from xer_reader.src.table import XerRow, XerTable, UnrecognizedTable, project_rows
 from xer_reader.src.table_data import table_data
 
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
 DATE_FORMAT = "%Y-%m-%d"
+MAX_ORPHAN_VALUES = 10
+ROW_CHUNK_SIZE = 2**20
+ROW_BATCH_SIZE = 10_000
 REQUIRED_TABLES = {"CALENDAR", "CURRTYPE", "PROJECT", "PROJWBS"}
+KEY_TABLES = {data["key"]: table for table, data in table_data.items() if data["key"]}
 
 
 class XerReader:
@@ -27,34 +55,260 @@ class XerReader:
     CODEC = "cp1252"
     file_name: str
     """XER file name"""
-    data: str
-    """XER file raw data as tab seperated text"""
-
-    def __init__(self, file: str | Path | BinaryIO) -> None:
-        self.file_name, self.data = _read_file(file)
 
-        _file_info = _parse_file_info(self.data)
-        self.currency: str = _file_info[7]
+    def __init__(
+        self,
+        file: str | Path | BinaryIO | bytes | bytearray | memoryview,
+        columnar: bool = False,
+        cache: XerCache | str | Path | None = None,
+        observer: Observer | None = None,
+        tables: list[str] | None = None,
+        columns: dict[str, list[str]] | None = None,
+        share_buffer: bool = False,
+    ) -> None:
+        if cache is not None and (tables is not None or columns is not None):
+            raise ValueError("The parse cache can not be used with tables or columns")
+        self._table_names = None if tables is None else {n.upper() for n in tables}
+        self._projection = {n.upper(): labels for n, labels in (columns or {}).items()}
+        self._observer = observer
+        start = perf_counter()
+        self.file_name, self._buffer = _read_file(file, share_buffer)
+        if observer:
+            observer(
+                StageEvent("read", perf_counter() - start, byte_count=len(self._buffer))
+            )
+        self._columnar = columnar
+        self._tables: dict[str, XerTable] = {}
+
+        header = self._buffer[: line_end(self._buffer, 0, len(self._buffer))]
+        self._file_info: list[str] = _parse_file_info(_decode(header))
+        self.currency: str = self._file_info[7]
         """(str) Currency type set in P6"""
-        self.export_version: str = _file_info[0]
+        self.export_version: str = self._file_info[0]
         """(str) P6 Version"""
-        self.export_date: datetime = datetime.strptime(_file_info[1], DATE_FORMAT)
+        self.export_date: datetime = datetime.strptime(self._file_info[1], DATE_FORMAT)
         """(datetime) Date the XER file was exported"""
-        self.export_user: str = _file_info[4]
+        self.export_user: str = self._file_info[4]
         """(str) P6 user name that exported the XER file"""
 
+        self.cache_hit: bool = False
+        """(bool) Tables were loaded from the parse cache"""
+        if cache is not None:
+            self._load_cache(cache if isinstance(cache, XerCache) else XerCache(cache))
+
+    def __enter__(self) -> "XerReader":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def __contains__(self, table_name: str) -> bool:
+        return self.has_table(table_name)
+
+    def __getitem__(self, table_name: str) -> XerTable:
+        """Get a parsed table. The table is parsed on first access and cached.
+
+        Raises:
+            KeyError: table is not included in the XER file
+            UnrecognizedTable: table is not a recognized P6 table
+        """
+        name = table_name.upper()
+        if (table := self._tables.get(name)) is not None:
+            return table
+
+        if name not in self._index:
+            raise KeyError(f"{table_name} not found")
+
+        table = self._table(name)
+        self._tables[name] = table
+        return table
+
+    def _table(self, table_name: str) -> XerTable:
+        """Get a table from the cache, or parse it without adding it to the cache."""
+        if (table := self._tables.get(table_name)) is not None:
+            return table
+        return self._parse(table_name, self._projection.get(table_name))
+
+    def _parse(
+        self,
+        table_name: str,
+        columns: list[str] | None,
+        where: dict[str, Any] | None = None,
+        predicate: Callable[[XerRow], bool] | None = None,
+    ) -> XerTable:
+        index = self._index[table_name]
+        start = perf_counter()
+        table = XerTable(
+            _decode(self._buffer[index.start + 3 : index.end]),
+            self._columnar,
+            columns,
+            where,
+            predicate,
+        )
+        if self._observer:
+            table.observer = self._observer
+            self._observer(
+                StageEvent(
+                    "parse",
+                    perf_counter() - start,
+                    table_name,
+                    index.end - index.start,
+                    len(table),
+                )
+            )
+        return table
+
+    def _labels(self, table_name: str) -> list[str]:
+        """Column labels of a table, limited to the selected columns"""
+        labels = self._index[table_name].labels
+        if (cols := self._projected_cols(table_name)) is None:
+            return labels
+        return [labels[col] for col in cols]
+
+    def _projected_cols(self, table_name: str) -> list[int] | None:
+        """Positions of the selected columns of a table, or None if all are selected"""
+        if (columns := self._projection.get(table_name)) is None:
+            return None
+        selected = set(columns)
+        return [
+            col
+            for col, label in enumerate(self._index[table_name].labels)
+            if label in selected
+        ]
+
+    def _iter_rows(self, table_name: str, project: bool = True) -> Iterator[list[str]]:
+        """Iterate over the unparsed rows of a table, limited to the selected columns
+        unless `project` is False.
+        The table is decoded in chunks of whole lines, so memory use stays flat."""
+        index = self._index[table_name]
+        cols = self._projected_cols(table_name) if project else None
+        start = index.body
+        while start < index.end:
+            end = min(start + ROW_CHUNK_SIZE, index.end)
+            end = line_end(self._buffer, end, index.end) if end < index.end else end
+            lines = _decode(self._buffer[start:end]).split("\n")
+            if cols is None:
+                for line in lines:
+                    if line.startswith("%R"):
+                        yield line.split("\t")[1:]
+            else:
+                lines = [line for line in lines if line.startswith("%R")]
+                yield from project_rows(lines, [col + 1 for col in cols])
+            start = end
+
+    def _load_cache(self, cache: XerCache) -> None:
+        start = perf_counter()
+        key = cache.key(self._buffer)
+        if (tables := cache.load(key, self._columnar)) is not None:
+            self._tables.update(tables)
+            self.cache_hit = True
+            if self._observer:
+                for table in tables.values():
+                    table.observer = self._observer
+        else:
+            cache.store(key, self.to_dict())
+        if self._observer:
+            self._observer(
+                StageEvent(
+                    "cache",
+                    perf_counter() - start,
+                    byte_count=len(self._buffer),
+                    row_count=sum(map(len, self._tables.values())),
+                    detail="hit" if self.cache_hit else "miss",
+                )
+            )
+
+    def clear_cache(self, *table_names: str) -> None:
+        """
+        Drop parsed tables from the cache. They will be parsed again on next access.
+
+        Args:
+            *table_names (str): table names to drop. If empty, all tables are dropped.
+        """
+        if not table_names:
+            self._tables.clear()
+            return
+
+        for name in table_names:
+            self._tables.pop(name.upper(), None)
+
+    @cached_property
+    def data(self) -> str:
+        """XER file raw data as tab seperated text.
+        Decoded from the raw file contents on first access."""
+        return _decode(self._buffer)
+
+    @cached_property
+    def _index(self) -> dict[str, TableIndex]:
+        start = perf_counter()
+        index = index_tables(self._buffer, XerReader.CODEC, self._table_names)
+        if self._observer:
+            self._observer(
+                StageEvent(
+                    "index",
+                    perf_counter() - start,
+                    byte_count=len(self._buffer),
+                    row_count=sum(table.row_count for table in index.values()),
+                )
+            )
+        return index
+
+    def close(self) -> None:
+        """Release the memory-mapped file or shared file buffer.
+        Tables that were already parsed remain available."""
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+        elif isinstance(self._buffer, memoryview):
+            self._buffer.release()
+
+    @staticmethod
+    def read_many(
+        files: list[str | Path],
+        workers: int | None = None,
+        tables: list[str] | None = None,
+        callback: Callable[[BatchResult], None] | None = None,
+    ) -> list[BatchResult]:
+        """
+        Parse many XER files in parallel using a process pool.
+        Errors are reported per file and do not stop the batch.
+
+        Args:
+            files (list[str | Path]): XER file paths
+            workers (int | None, optional): number of processes. [Defaults to the CPU count]
+            tables (list[str] | None, optional): table names to parse. [Defaults to all tables]
+            callback (Callable[[BatchResult], None] | None, optional): called with each
+                result as soon as it is ready. Results passed to the callback are not kept.
+
+        Returns:
+            list[BatchResult]: file path, parsed tables and error for each file,
+            in order of completion
+        """
+        return read_many(files, workers, tables, callback)
+
+    @staticmethod
+    def stream(file: str | Path | BinaryIO) -> Iterator[StreamTable]:
+        """
+        Read an XER file table by table and row by row without loading
+        the whole file into memory.
+
+        Args:
+            file (str | Path | BinaryIO): XER file path or binary file
+
+        Yields:
+            StreamTable: table name, column labels and an iterator over the rows.
+            The rows must be consumed before moving on to the next table.
+        """
+        return stream_tables(file, XerReader.CODEC)
+
     def check_errors(self) -> list[str]:
-        """Check XER file for missing tables and orphan data
+        """Check XER file for missing tables and orphan data.
+        Orphan data is reported once per table and column, along with the
+        number of entries affected.
 
         Returns:
             list[str]: Descriptions of missing information
         """
         errors = set()
-
-        id_map = {
-            data["key"]: table for table, data in table_data.items() if data["key"]
-        }
-
         tables = self.to_dict()
 
         # Check for minimum tables required to be in the XER
@@ -68,26 +322,36 @@ class XerReader:
                 if table2 not in tables:
                     errors.add(f"Missing Table {table2} Required for Table {table}")
 
-            for row in table.entries():
-                for key, val in row.items():
-                    if val == "":
-                        continue
-                    if not key.endswith("_id"):
-                        continue
-                    if key == "parent_wbs_id" and row["proj_node_flag"] == "Y":
-                        continue
-                    clean_key = key if key in id_map else _clean_foreign_key_label(key)
-                    if clean_key:
-                        if check_table := tables.get(id_map[clean_key]):
-                            for entry in check_table.entries():
-                                if entry.get(clean_key, "") == val:
-                                    break
-                            else:
-                                errors.add(
-                                    f"Orphan data {key} [{val}] in table {table}"
-                                )
-
-        return list(errors)
+        # Check foreign keys against a set of the key values in each table
+        key_values: dict[str, set[str]] = {}
+        orphans = []
+        for table in tables.values():
+            for label in table.labels:
+                if not label.endswith("_id"):
+                    continue
+                clean_key = (
+                    label if label in KEY_TABLES else _clean_foreign_key_label(label)
+                )
+                if not (check_table := tables.get(KEY_TABLES.get(clean_key, ""))):
+                    continue
+                if check_table.name not in key_values:
+                    key_values[check_table.name] = (
+                        set(check_table.raw_column(clean_key))
+                        if clean_key in check_table.labels
+                        else set()
+                    )
+
+                values = table.raw_column(label)
+                if label == "parent_wbs_id" and "proj_node_flag" in table.labels:
+                    flags = table.raw_column("proj_node_flag")
+                    values = [val for val, flag in zip(values, flags) if flag != "Y"]
+
+                keys = key_values[check_table.name]
+                missing = Counter(val for val in values if val and val not in keys)
+                if missing:
+                    orphans.append(_orphan_error(table.name, label, missing))
+
+        return list(errors) + orphans
 
     def delete_tables(self, *table_names: str) -> str:
         """
@@ -103,11 +367,195 @@ class XerReader:
         if not table_names:
             raise ValueError("Must pass at least one table name")
 
-        rev_data = self.data
-        for name in table_names:
-            table_search = re.compile(rf"%T\t{name.upper()}\r?\n(.|\s)*?(?=%T|%E)")
-            rev_data = table_search.sub("", rev_data)
-        return rev_data
+        names = {name.upper() for name in table_names}
+        removed = sorted(
+            (table.start, table.end)
+            for name, table in self._index.items()
+            if name in names
+        )
+
+        rev_data = []
+        position = 0
+        for start, end in removed:
+            rev_data.append(_decode(self._buffer[position:start]))
+            position = end
+        rev_data.append(_decode(self._buffer[position:]))
+        return "".join(rev_data)
+
+    def diff(
+        self, other: "XerReader", table_names: list[str] = []
+    ) -> dict[str, TableDiff]:
+        """
+        Compare the tables in this XER file with another XER file, such as the
+        previous and current update of a schedule. Rows are matched by the table
+        key, or by all `_id` columns for tables without a key, and tables whose
+        raw text is identical are skipped.
+
+        Args:
+            other (XerReader): XER file to compare with
+            table_names (list, optional): List of table names to compare. If empty, all tables will be compared.
+
+        Returns:
+            dict[str, TableDiff]: rows added in `other`, removed from `other`, and
+            changed columns by key value, for each table with differences
+        """
+        names = [name.upper() for name in table_names]
+        diffs: dict[str, TableDiff] = {}
+        for name in {**self._index, **other._index}:
+            if name not in table_data or (table_names and name not in names):
+                continue
+
+            old, new = self._index.get(name), other._index.get(name)
+            if (
+                old
+                and new
+                and self._projection.get(name) == other._projection.get(name)
+                and _same_text(self._buffer, old, other._buffer, new)
+            ):
+                continue
+
+            diffs[name] = diff_table(
+                name,
+                self._labels(name) if old else [],
+                self._iter_rows(name) if old else [],
+                other._labels(name) if new else [],
+                other._iter_rows(name) if new else [],
+            )
+        return diffs
+
+    @timed_export
+    def extract_projects(
+        self, proj_ids: Iterable[int | str], file: str | Path | BinaryIO
+    ) -> None:
+        """
+        Write a new XER file containing only the selected projects.
+        Rows are kept when each of their foreign keys is blank or points to a row
+        that is kept, starting from the project IDs. Keys left in a filtered table
+        carry forward to the tables that depend on it, so ACTVCODE follows ACTVTYPE
+        and TASKPRED follows TASK. Tables that do not depend on a project, such as
+        CURRTYPE, are kept along with global entries. Tables with no rows left are
+        left out. The output is written table by table as it is filtered.
+
+        Args:
+            proj_ids (Iterable[int | str]): IDs of the projects to keep
+            file (str | Path | BinaryIO): Path of the new XER file, or a writable binary file
+        """
+        selected = self._selected_keys({str(proj_id) for proj_id in proj_ids})
+
+        if isinstance(file, (str, Path)):
+            with open(file, "wb") as f:
+                self._write_projects(f, selected)
+        else:
+            self._write_projects(file, selected)
+
+    def _foreign_keys(self, table_name: str) -> dict[int, str]:
+        """Key labels that the columns of a table point to, by column position.
+        References to other rows of the same table are left out."""
+        keys = {}
+        for col, label in enumerate(self._index[table_name].labels):
+            if not label.endswith("_id"):
+                continue
+            key = label if label in KEY_TABLES else _clean_foreign_key_label(label)
+            if key in KEY_TABLES and (label == key or KEY_TABLES[key] != table_name):
+                keys[col] = key
+        return keys
+
+    def _selected_keys(self, projects: set[str]) -> dict[str, set[str]]:
+        """Key values left in each filtered table, by key label.
+        Tables are visited after the tables their foreign keys point to, and only
+        tables with keys that other tables point to are read."""
+        selected = {"proj_id": projects}
+        foreign_keys = {name: self._foreign_keys(name) for name in self._index}
+        referenced = {
+            key
+            for name, keys in foreign_keys.items()
+            for key in keys.values()
+            if KEY_TABLES[key] != name
+        }
+        pending = [
+            name
+            for name in self._index
+            if (key := table_data.get(name, {}).get("key")) in referenced
+            and key not in selected
+            and key in self._index[name].labels
+        ]
+        while pending:
+            # Parents first, unless the tables point to each other
+            name = next(
+                (
+                    name
+                    for name in pending
+                    if not any(
+                        KEY_TABLES[key] in pending and KEY_TABLES[key] != name
+                        for key in foreign_keys[name].values()
+                    )
+                ),
+                pending[0],
+            )
+            pending.remove(name)
+            filters = [
+                (col, selected[key])
+                for col, key in foreign_keys[name].items()
+                if key in selected
+            ]
+            if not filters:
+                # Keys of tables that are not filtered are all kept
+                continue
+            key = table_data[name]["key"]
+            key_col = self._index[name].labels.index(key)
+            selected[key] = {
+                row[key_col]
+                for row in self._iter_rows(name, project=False)
+                if _kept(row, filters)
+            }
+        return selected
+
+    def _write_projects(self, f: BinaryIO, selected: dict[str, set[str]]) -> None:
+        header_end = line_end(self._buffer, 0, len(self._buffer))
+        crlf = self._buffer[header_end - 2 : header_end] == b"\r\n"
+        newline = "\r\n" if crlf else "\n"
+        f.write(self._buffer[:header_end])
+
+        for name, index in self._index.items():
+            filters = [
+                (col, selected[key])
+                for col, key in self._foreign_keys(name).items()
+                if key in selected
+            ]
+            cols = self._projected_cols(name)
+            if not filters and cols is None:
+                # Nothing to filter, copy the raw table as is
+                f.write(self._buffer[index.start : index.end])
+                continue
+
+            rows = (
+                row
+                for row in self._iter_rows(name, project=False)
+                if _kept(row, filters)
+            )
+            if (first := next(rows, None)) is None:
+                continue
+
+            # Table name and column labels are only written if any rows are kept
+            if cols is None:
+                f.write(
+                    self._buffer[
+                        index.start : line_end(self._buffer, index.body, index.end)
+                    ]
+                )
+            else:
+                header = f"%T\t{name}{newline}%F\t" + "\t".join(self._labels(name))
+                f.write((header + newline).encode(XerReader.CODEC))
+            rows = chain([first], rows)
+            if cols is not None:
+                rows = (
+                    [row[col] if col < len(row) else "" for col in cols] for row in rows
+                )
+            while batch := list(islice(rows, ROW_BATCH_SIZE)):
+                text = "".join("%R\t" + "\t".join(row) + newline for row in batch)
+                f.write(text.encode(XerReader.CODEC))
+
+        f.write(f"%E{newline}".encode(XerReader.CODEC))
 
     def get_table_names(self) -> list[str]:
         """Get list of table names included in the XER file.
@@ -115,8 +563,7 @@ class XerReader:
         Returns:
             list[str]: list of table names
         """
-        table_names = re.compile(r"(?<=%T\t)[A-Z]+")
-        return table_names.findall(self.data)
+        return list(self._index)
 
     def get_table_str(self, table_name: str) -> str:
         """Get string for a specific table in the XER file.
@@ -127,9 +574,10 @@ class XerReader:
         Returns:
             str: Table header and rows
         """
-        re_search = re.compile(rf"(?<=%T\t{table_name.upper()}\n)(.|\s)*?(?=%T|%E)")
-        if found_table := re_search.search(self.data):
-            return re.sub(r"%[TFR]\t", "", found_table.group())
+        if table := self._index.get(table_name.upper()):
+            return re.sub(
+                r"%[TFR]\t", "", _decode(self._buffer[table.body : table.end])
+            )
         return ""
 
     def has_table(self, table_name: str) -> bool:
@@ -141,91 +589,286 @@ class XerReader:
         Returns:
             bool: True if found; False if not found
         """
-        return f"%T\t{table_name.upper()}" in self.data
+        return table_name.upper() in self._index
+
+    def table(
+        self,
+        table_name: str,
+        where: dict[str, Any] | None = None,
+        predicate: Callable[[XerRow], bool] | None = None,
+    ) -> XerTable:
+        """
+        Get a table with only the rows matching a filter.
+        Rows are filtered while the table is parsed, so rejected rows are never
+        stored or converted. Filtered tables are not added to the cache.
+
+        Args:
+            table_name (str): table name
+            where (dict[str, Any] | None, optional): value, or list of values, to match
+                by column label. Values are compared as they are written in the XER file,
+                so `{"proj_id": 123}` matches the text `123`. [Default is no filter]
+            predicate (Callable[[XerRow], bool] | None, optional): called with a view
+                of each row that matches `where`; rows are kept if it returns True.
+                [Default is no filter]
+
+        Raises:
+            KeyError: table is not included in the XER file, or a `where` label is not in the table
+            UnrecognizedTable: table is not a recognized P6 table
+
+        Returns:
+            XerTable: table with the matching rows
+        """
+        if not where and predicate is None:
+            return self[table_name]
+
+        name = table_name.upper()
+        if name not in self._index:
+            raise KeyError(f"{table_name} not found")
+        return self._parse(name, self._projection.get(name), where, predicate)
 
-    def to_dict(self) -> dict[str, XerTable]:
+    def to_dict(
+        self,
+        tables: list[str] | None = None,
+        columns: dict[str, list[str]] | None = None,
+    ) -> dict[str, XerTable]:
         """
         Parse tables into a dictionary with the table name as the key
         and a `Table` object as the value.
+        Tables that were already parsed are taken from the cache.
+
+        Args:
+            tables (list[str] | None, optional): table names to include. [Default is all tables]
+            columns (dict[str, list[str]] | None, optional): column labels to keep, by table name.
+                Tables listed here are parsed again and are not added to the cache. [Default is all columns]
 
         Returns:
             dict[str, Table]: dict of XER Tables
         """
-        tables = {}
-        for table_str in self.data.split("%T\t")[1:]:
+        names = None if tables is None else {name.upper() for name in tables}
+        projection = {name.upper(): labels for name, labels in (columns or {}).items()}
+        parsed = {}
+        for name in self._index:
+            if names is not None and name not in names:
+                continue
             try:
-                table = XerTable(table_str)
-                tables[table.name] = table
+                if name in projection:
+                    parsed[name] = self._parse(name, projection[name])
+                else:
+                    parsed[name] = self[name]
             except UnrecognizedTable:
                 continue
-        return tables
+        return parsed
 
+    @timed_export
+    def to_arrow(self, table_names: list[str] = []) -> dict[str, "pa.Table"]:
+        """Convert tables in the XER file to Apache Arrow tables.
+        Column data types are inferred from the column labels. Requires `pyarrow`.
+
+        Args:
+            table_names (list, optional): List of table names to include. If empty, all tables will be included.
+
+        Returns:
+            dict[str, pa.Table]: Arrow tables by table name
+        """
+        names = [name.upper() for name in table_names]
+        return {
+            name: table_to_arrow(self._table(name))
+            for name in self._index
+            if name in table_data and (not table_names or name in names)
+        }
+
+    @timed_export
     def to_csv(
         self,
         file_directory: str | Path = Path.cwd(),
         table_names: list[str] = [],
         delimeter: str = "\t",
+        compress: bool = False,
+        workers: int | None = None,
     ) -> None:
         """
         Generate a CSV file for each table in the XER file.
         Uses `tab` as the delimiter by default.
+        Rows are streamed from the raw table text, so tables are not parsed,
+        and the tables are written in parallel.
 
         Args:
             file_directory (str | Path, optional): Directory to save CSV files. [Defaults to current working directory]
             table_names (list, optional): List of table names to save to CSV files. If empty, all tables will be saved.
             delimeter (str, optional): CSV delimeter. [Default is a `tab`]
+            compress (bool, optional): Write gzip compressed `.csv.gz` files. [Default is False]
+            workers (int | None, optional): Number of tables to write at once. [Defaults to the ThreadPoolExecutor default]
         """
         names = [name.upper() for name in table_names]
-        for table in self.to_dict().values():
-            if not table_names or table.name in names:
-                _write_table_to_csv(
-                    f"{self.file_name}_{table.name}",
-                    table,
+        selected = [
+            name
+            for name in self._index
+            if name in table_data and (not table_names or name in names)
+        ]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    _write_table_to_csv,
+                    f"{self.file_name}_{name}",
+                    self._labels(name),
+                    self._iter_rows(name),
                     Path(file_directory),
                     delimeter,
+                    compress,
                 )
+                for name in selected
+            ]
+            for future in futures:
+                future.result()
+
+    @timed_export
+    def to_dataframes(self, table_names: list[str] = []) -> dict[str, "pd.DataFrame"]:
+        """Convert tables in the XER file to pandas DataFrames.
+        Column data types are inferred from the column labels. Requires `pandas`.
 
-    def to_excel(self, file_directory: str | Path = Path.cwd()) -> None:
+        Args:
+            table_names (list, optional): List of table names to include. If empty, all tables will be included.
+
+        Returns:
+            dict[str, pd.DataFrame]: DataFrames by table name
+        """
+        names = [name.upper() for name in table_names]
+        return {
+            name: self._table(name).to_dataframe()
+            for name in self._index
+            if name in table_data and (not table_names or name in names)
+        }
+
+    @timed_export
+    def to_excel(
+        self,
+        file_directory: str | Path = Path.cwd(),
+        table_names: list[str] = [],
+        row_limit: int | None = None,
+    ) -> None:
         """
         Generate an Excel file with each table in the XER file on a seperate worksheet.
+        The workbook is written in write-only mode with rows streamed from the raw
+        table text, so memory use does not grow with the number of rows.
 
+        Args:
+            file_directory (str | Path, optional): Directory to save the Excel file. [Defaults to current working directory]
+            table_names (list, optional): List of table names to include. If empty, all tables will be included.
+            row_limit (int | None, optional): Maximum number of rows written to each worksheet. [Default is no limit]
         """
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "ERMHDR"
-        ws.append(_parse_file_info(self.data))
+        names = [name.upper() for name in table_names]
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("ERMHDR")
+        ws.append(self._file_info)
 
-        for name, table in self.to_dict().items():
+        for name in self._index:
+            if name not in table_data or (table_names and name not in names):
+                continue
+
+            labels = self._labels(name)
             new_ws = wb.create_sheet(name)
-            new_ws.append(table.labels)
-            for entry in table.rows:
-                new_ws.append(entry)
+            new_ws.append(labels)
+            row_count = 0
+            for row in islice(self._iter_rows(name), row_limit):
+                new_ws.append(row)
+                row_count += 1
+
+            # Write-only worksheets can not read back the header row,
+            # so the table columns are named from the labels
+            ref = f"A1:{get_column_letter(max(len(labels), 1))}{row_count + 1}"
+            tab = Table(displayName=name, ref=ref)
+            tab.tableColumns = [
+                TableColumn(id=col, name=label)
+                for col, label in enumerate(labels, start=1)
+            ]
+            with warnings.catch_warnings():
+                # openpyxl always warns about columns in write-only mode
+                warnings.simplefilter("ignore", UserWarning)
+                new_ws.add_table(tab)
+
+        wb.save(Path(file_directory, f"{self.file_name}.xlsx"))
+
+    @timed_export
+    def to_parquet(
+        self, file_directory: str | Path = Path.cwd(), table_names: list[str] = []
+    ) -> None:
+        """
+        Generate a Parquet file for each table in the XER file.
+        Files are named `{file_name}_{table_name}.parquet`. Requires `pyarrow`.
 
-            tab = Table(displayName=name, ref=new_ws.calculate_dimension())
+        Args:
+            file_directory (str | Path, optional): Directory to save the Parquet files. [Defaults to current working directory]
+            table_names (list, optional): List of table names to include. If empty, all tables will be included.
+        """
+        import_pyarrow()
+        import pyarrow.parquet as pq
 
-            new_ws.add_table(tab)
+        names = [name.upper() for name in table_names]
+        for name in self._index:
+            if name not in table_data or (table_names and name not in names):
+                continue
+            pq.write_table(
+                table_to_arrow(self._table(name)),
+                Path(file_directory, f"{self.file_name}_{name}.parquet"),
+            )
+
+    @timed_export
+    def to_sqlite(
+        self, database: str | Path | sqlite3.Connection, table_names: list[str] = []
+    ) -> None:
+        """
+        Write the tables in the XER file to a SQLite database.
+        Columns are typed from their labels and rows are inserted in bulk from the raw
+        table text in a single transaction. Existing tables with the same name are replaced, and indexes are
+        created on each table's key and `_id` columns.
 
-        wb.save(Path(file_directory, f"{self.file_name}.xlsx"))
+        Args:
+            database (str | Path | sqlite3.Connection): Path to a database file, or an open connection.
+            table_names (list, optional): List of table names to include. If empty, all tables will be included.
+        """
+        names = [name.upper() for name in table_names]
+        selected = (
+            StreamTable(name, self._labels(name), self._iter_rows(name))
+            for name in self._index
+            if name in table_data and (not table_names or name in names)
+        )
+        if isinstance(database, sqlite3.Connection):
+            write_sqlite(database, selected)
+            return
+
+        conn = sqlite3.connect(database)
+        try:
+            write_sqlite(conn, selected)
+        finally:
+            conn.close()
+
+    @timed_export
+    def to_json(
+        self, *tables: str, file: TextIO | None = None, ndjson: bool = False
+    ) -> str | None:
+        """Generate a json compliant string representation of tables in the XER file.
+        Entries are encoded one at a time, so passing a `file` writes the json
+        incrementally without building the whole document in memory.
 
-    def to_json(self, *tables: str) -> str:
-        """Generate a json compliant string representation of tables in the XER file
+        Args:
+            *tables (str): table names to include. If empty, all tables are included.
+            file (TextIO | None, optional): writable text file to write the json to. [Default is None]
+            ndjson (bool, optional): write one json record per line, with the table name attached to each entry. [Default is False]
 
         Returns:
-            str: json compliant string representation of XER tables
+            str | None: json compliant string representation of XER tables, or None if written to `file`
         """
-        out_data = {}
-        if not tables:
-            out_data = {
-                name: _entry_by_key(table) for name, table in self.to_dict().items()
-            }
+        fp = io.StringIO() if file is None else file
+        selected = (
+            self._table(name)
+            for name in self._index
+            if name in table_data and (not tables or name in tables)
+        )
+        if ndjson:
+            write_ndjson(fp, selected)
         else:
-            out_data = {
-                name: _entry_by_key(table)
-                for name, table in self.to_dict().items()
-                if name in tables
-            }
-        json_data = {self.file_name: {**out_data}}
-        return json.dumps(json_data, indent=2)
+            write_json(fp, self.file_name, selected)
+        return fp.getvalue() if file is None else None
 
 
 def _clean_foreign_key_label(label: str) -> str | None:
@@ -236,10 +879,35 @@ def _clean_foreign_key_label(label: str) -> str | None:
     return
 
 
-def _entry_by_key(table: XerTable) -> dict | list:
-    if not table.key:
-        return table.entries(serialize=True)
-    return {entry[table.key]: entry for entry in table.entries(serialize=True)}
+def _kept(row: list[str], filters: list[tuple[int, set[str]]]) -> bool:
+    """Check if each filtered column of a row is missing, blank or a kept key"""
+    return all(
+        col >= len(row) or not row[col] or row[col] in ids for col, ids in filters
+    )
+
+
+def _orphan_error(table_name: str, label: str, missing: Counter) -> str:
+    values = ", ".join(list(missing)[:MAX_ORPHAN_VALUES])
+    if len(missing) > MAX_ORPHAN_VALUES:
+        values += ", ..."
+    return (
+        f"Orphan data {label} [{values}] in table {table_name} "
+        f"({missing.total()} entries, {len(missing)} unique values)"
+    )
+
+
+def _same_text(
+    buffer: Buffer, index: TableIndex, other: Buffer, other_index: TableIndex
+) -> bool:
+    """Check if the raw text of two tables is byte-identical"""
+    if index.end - index.start != other_index.end - other_index.start:
+        return False
+    return buffer[index.start : index.end] == other[other_index.start : other_index.end]
+
+
+def _decode(raw: Buffer) -> str:
+    """Decode raw file contents to text with normalized line endings"""
+    return str(raw, XerReader.CODEC, "ignore").replace("\r\n", "\n")
 
 
 def _parse_file_info(data: str) -> list[str]:
@@ -250,31 +918,86 @@ def _parse_file_info(data: str) -> list[str]:
     return ermhdr.group().split("\t")
 
 
-def _read_file(file: str | Path | BinaryIO) -> tuple[str, str]:
-    file_contents = ""
+def _read_file(
+    file: str | Path | BinaryIO | bytes | bytearray | memoryview,
+    share_buffer: bool = False,
+) -> tuple[str, Buffer]:
+    file_contents: Buffer = b""
     file_name = ""
     if isinstance(file, (str, Path)):
         # Path directory to file
         file_name = Path(file).stem
-        with open(file, encoding=XerReader.CODEC, errors="ignore") as f:
-            file_contents = f.read()
+        with open(file, "rb") as f:
+            try:
+                file_contents = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files can not be memory-mapped
+                file_contents = b""
+    elif isinstance(file, (bytes, bytearray)):
+        # Raw file contents already in memory
+        file_contents = file
+    elif isinstance(file, memoryview):
+        # A view of its own, so `close` does not release the caller's view
+        file_contents = memoryview(file)
     else:
         # Binary file from requests, Flask, FastAPI, etc...
-        file_contents = file.read().decode(XerReader.CODEC, errors="ignore")
-        file_name = file.name
+        file_contents = _read_binary(file, share_buffer)
+        file_name = name if isinstance(name := getattr(file, "name", ""), str) else ""
 
-    if not file_contents.startswith("ERMHDR"):
+    if file_contents[:6] != b"ERMHDR":
         raise ValueError(f"ValueError: {file_name} is invalid XER file")
 
     return file_name, file_contents
 
 
+def _read_binary(file: BinaryIO, share_buffer: bool = False) -> Buffer:
+    """Get the contents of a binary file from its current position.
+    Files on disk are memory-mapped and other seekable files are read once into a
+    buffer of the right size. With `share_buffer`, the buffer of an `io.BytesIO`
+    is shared instead of copied."""
+    if share_buffer and isinstance(file, io.BytesIO):
+        return file.getbuffer()[file.tell() :]
+    if not (hasattr(file, "seekable") and file.seekable()):
+        return file.read()
+
+    position = file.tell()
+    size = file.seek(0, io.SEEK_END) - position
+    # A spooled file still in memory would be rolled over to disk by `fileno`
+    if position == 0 and not isinstance(file, tempfile.SpooledTemporaryFile):
+        try:
+            contents = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (AttributeError, OSError, ValueError):
+            # No file descriptor, or an empty file
+            pass
+        else:
+            file.seek(position)
+            return contents
+
+    file.seek(position)
+    if not hasattr(file, "readinto"):
+        return file.read()
+    contents = bytearray(size)
+    with memoryview(contents) as view:
+        read = 0
+        while read < size and (count := file.readinto(view[read:])):
+            read += count
+    del contents[read:]
+    return contents
+
+
 def _write_table_to_csv(
-    name: str, table: XerTable, file_directory: Path, delimeter
+    name: str,
+    labels: list[str],
+    rows: Iterable[list[str]],
+    file_directory: Path,
+    delimeter: str,
+    compress: bool = False,
 ) -> None:
-    with file_directory.joinpath(f"{name}.csv").open("w") as f:
+    if compress:
+        f = gzip.open(file_directory.joinpath(f"{name}.csv.gz"), "wt")
+    else:
+        f = file_directory.joinpath(f"{name}.csv").open("w")
+    with f:
         writer = csv.writer(f, delimiter=delimeter)
-        writer.writerow(table.labels)
-        for row in table.rows:
-            writer.writerow(row)
-    f.close()
+        writer.writerow(labels)
+        writer.writerows(rows)
@@ -0,0 +1,88 @@
+"""
+This module contains the SQLite writer used by `XerReader.to_sqlite`. Each
+table is created with column types inferred from its labels, loaded with
+`executemany` straight from the raw table text, and indexed on its key and
+`_id` columns once all rows are in.
+
+"""
+
+import sqlite3
+from typing import Iterable, Iterator
+
+from xer_reader.src.stream import StreamTable
+from xer_reader.src.table import column_type
+from xer_reader.src.table_data import table_data
+
+SQL_TYPES = {
+    "int": "INTEGER",
+    "float": "REAL",
+    "date": "TEXT",
+    "flag": "INTEGER",
+    "str": "TEXT",
+}
+
+# Values are converted by SQLite while inserting, which is much faster than
+# converting them in Python. Text is stored as a number by the INTEGER and
+# REAL column affinity when it is a well-formed number.
+SQL_VALUES = {
+    "float": "NULLIF(REPLACE(?, ',', '.'), '')",
+    "flag": "CASE ? WHEN '' THEN NULL WHEN 'Y' THEN 1 ELSE 0 END",
+}
+SQL_VALUE = "NULLIF(?, '')"
+
+
+def write_sqlite(conn: sqlite3.Connection, tables: Iterable[StreamTable]) -> None:
+    """Write tables to a SQLite database in a single transaction.
+
+    Existing tables with the same name are replaced. Empty values are stored as
+    NULL, dates as text in the form `YYYY-MM-DD HH:MM` and flags as 0 or 1. An
+    index is created on the key of each table and on every `_id` column. Tables
+    without columns are skipped.
+
+    Args:
+        conn (sqlite3.Connection): open database connection
+        tables (Iterable[StreamTable]): tables with their unparsed rows
+    """
+    with conn:
+        # sqlite3 does not open a transaction before DDL statements, so without an
+        # explicit BEGIN each dropped and created table would be committed at once
+        if not conn.in_transaction:
+            conn.execute("BEGIN")
+        for table in tables:
+            if not table.labels:
+                # SQLite tables need at least one column, e.g. when none are selected
+                continue
+            name = _quote(table.name)
+            types = [column_type(label) for label in table.labels]
+            columns = ", ".join(
+                f"{_quote(label)} {SQL_TYPES[data_type]}"
+                for label, data_type in zip(table.labels, types)
+            )
+            conn.execute(f"DROP TABLE IF EXISTS {name}")
+            conn.execute(f"CREATE TABLE {name} ({columns})")
+
+            values = ", ".join(
+                SQL_VALUES.get(data_type, SQL_VALUE) for data_type in types
+            )
+            conn.executemany(
+                f"INSERT INTO {name} VALUES ({values})",
+                _fit_rows(table.rows, len(table.labels)),
+            )
+
+            indexed = [label for label in table.labels if label.endswith("_id")]
+            key = table_data.get(table.name, {}).get("key")
+            if key in table.labels and key not in indexed:
+                indexed.insert(0, key)
+            for label in indexed:
+                index_name = _quote(f"{table.name}_{label}_idx")
+                conn.execute(f"CREATE INDEX {index_name} ON {name} ({_quote(label)})")
+
+
+def _fit_rows(rows: Iterable[list[str]], width: int) -> Iterator[list[str]]:
+    """Pad or trim rows to the number of columns"""
+    for row in rows:
+        yield row if len(row) == width else (row + [""] * width)[:width]
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
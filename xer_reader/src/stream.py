@@ -0,0 +1,85 @@
+"""
+This module contains the streaming parser used by `XerReader.stream`, which
+reads an XER file line by line rather than loading it into memory.
+
+"""
+
+import io
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterator, NamedTuple, TextIO
+
+
+class StreamTable(NamedTuple):
+    """A table read from an XER file stream"""
+
+    name: str
+    """Table Name"""
+    labels: list[str]
+    """List Entry Labels or Column Headers"""
+    rows: Iterator[list[str]]
+    """Iterator over the Rows of Data. Must be consumed before the next table is read."""
+
+
+def stream_tables(file: str | Path | BinaryIO, codec: str) -> Iterator[StreamTable]:
+    """Read the tables in an XER file one row at a time.
+
+    Only the current row is held in memory. Any rows of a table that are not
+    consumed are skipped when the next table is requested.
+
+    Args:
+        file (str | Path | BinaryIO): XER file path or binary file
+        codec (str): text encoding of the XER file
+
+    Yields:
+        StreamTable: table name, column labels and a row iterator
+    """
+    with _open_lines(file, codec) as lines:
+        if not next(lines, "").startswith("ERMHDR"):
+            raise ValueError(
+                f"ValueError: {getattr(file, 'name', file)} is invalid XER file"
+            )
+
+        line = next(lines, "")
+        while line:
+            if line.startswith("%E"):
+                return
+
+            if not line.startswith("%T\t"):
+                line = next(lines, "")
+                continue
+
+            name = line[3:].rstrip("\r\n")
+            labels = next(lines, "").rstrip("\r\n").split("\t")[1:]
+            next_line: list[str] = []
+            rows = _read_rows(lines, next_line)
+
+            yield StreamTable(name, labels, rows)
+
+            for _ in rows:
+                pass
+            line = next_line[0] if next_line else ""
+
+
+def _read_rows(lines: TextIO, next_line: list[str]) -> Iterator[list[str]]:
+    for line in lines:
+        if not line.startswith("%R"):
+            next_line.append(line)
+            return
+        yield line.rstrip("\r\n").split("\t")[1:]
+
+
+@contextmanager
+def _open_lines(file: str | Path | BinaryIO, codec: str) -> Iterator[TextIO]:
+    if isinstance(file, (str, Path)):
+        with open(file, encoding=codec, errors="ignore") as f:
+            yield f
+        return
+
+    # Binary file from requests, Flask, FastAPI, etc...
+    # Detach the wrapper so closing it does not close the caller's file.
+    wrapper = io.TextIOWrapper(file, encoding=codec, errors="ignore")
+    try:
+        yield wrapper
+    finally:
+        wrapper.detach()
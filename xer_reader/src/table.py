@@ -1,10 +1,24 @@
-import re
-from datetime import datetime
-from typing import Any
-
+from array import array
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+from functools import lru_cache
+from operator import itemgetter
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, Sequence
+
+from xer_reader.src.instrument import Observer, StageEvent
 from xer_reader.src.table_data import table_data
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 DATE_HR_FORMAT = "%Y-%m-%d %H:%M"
+DATE_CACHE_SIZE = 2**16
+EPOCH = datetime(1970, 1, 1)
+MINUTE = timedelta(minutes=1)
+# Empty values in int and date columns stored in typed arrays
+MISSING_INT = -(2**63)
+NAN = float("nan")
 
 
 class UnrecognizedTable(Exception):
@@ -16,11 +30,61 @@ class UnrecognizedTable(Exception):
         return self.message
 
 
+class XerRow(Mapping):
+    """
+    A lightweight view of a single row in a P6 table.
+    Values can be read by key or attribute and are converted when they are read.
+    """
+
+    __slots__ = ("_schema", "_values")
+
+    def __init__(
+        self, schema: dict[str, tuple[int, "Converter"]], values: Sequence[str]
+    ) -> None:
+        self._schema = schema
+        self._values = values
+
+    def __getattr__(self, label: str):
+        if label.startswith("_"):
+            # Slots and special methods are never labels
+            raise AttributeError(label)
+        try:
+            return self[label]
+        except KeyError:
+            raise AttributeError(label) from None
+
+    def __getitem__(self, label: str):
+        col, converter = self._schema[label]
+        return converter(self._values[col] if col < len(self._values) else "")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._schema)
+
+    def __len__(self) -> int:
+        return len(self._schema)
+
+    def __repr__(self) -> str:
+        return f"XerRow({dict(self)})"
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert every value of the row into a dictionary"""
+        return dict(self)
+
+
 class XerTable:
     """A class representing a P6 table"""
 
-    def __init__(self, data: str) -> None:
-        _lines: list[str] = re.split(r"\r?\n", data)
+    def __init__(
+        self,
+        data: str,
+        columnar: bool = False,
+        columns: list[str] | None = None,
+        where: dict[str, Any] | None = None,
+        predicate: Callable[[XerRow], bool] | None = None,
+    ) -> None:
+        if "\r" in data:
+            data = data.replace("\r\n", "\n")
+        _lines: list[str] = data.split("\n")
 
         # First line is the table name
         self.name: str = _lines.pop(0)
@@ -37,63 +101,495 @@ class XerTable:
         """Label Name for Unique ID of Table Entries"""
 
         # Second line is the column labels
-        self.labels: list[str] = _lines.pop(0).strip().split("\t")[1:]
+        _labels = _lines.pop(0).strip().split("\t")
+        # Positions of the selected columns in each line, after the `%R` field
+        _selected = None if columns is None else set(columns)
+        _cols = [
+            col
+            for col, label in enumerate(_labels[1:], start=1)
+            if _selected is None or label in _selected
+        ]
+        self.labels: list[str] = [_labels[col] for col in _cols]
         """List Entry Labels or Column Headers"""
 
         # Remaining lines are the data rows
-        self.rows: list[list[str]] = [
-            row.split("\t")[1:] for row in _lines if row.startswith("%R")
-        ]
-        """Nested Array containing Rows of Data"""
+        _lines = [row for row in _lines if row.startswith("%R")]
+        if where or predicate:
+            _lines = _filter_lines(_lines, _labels, where or {}, predicate)
+        self._length: int = len(_lines)
+        self._rows: list[list[str]] | None = None
+        self._columns: dict[str, Sequence] | None = None
+        if columnar:
+            self._columns = _to_columns(self.labels, _lines, len(_labels), _cols)
+        elif columns is None:
+            self._rows = [row.split("\t")[1:] for row in _lines]
+        else:
+            self._rows = project_rows(_lines, _cols)
 
         self._entries: list[dict[str, Any]] = []
         self._serialized: bool = False
+        self._key_index: dict[Any, XerRow] | None = None
+        self._indexes: dict[str, dict[Any, list[XerRow]]] = {}
+        self.observer: Observer | None = None
+        """Called with a `StageEvent` when the entries are converted"""
+
+    @classmethod
+    def from_columns(
+        cls,
+        name: str,
+        labels: list[str],
+        columns: list[Sequence[str]],
+        columnar: bool = False,
+    ) -> "XerTable":
+        """Create a table from the text values of each column.
+
+        Args:
+            name (str): table name
+            labels (list[str]): column labels
+            columns (list[Sequence[str]]): text values of each column, in label order
+            columnar (bool, optional): store the table by column. [Default is False]
+
+        Returns:
+            XerTable: P6 table
+        """
+        table = cls(f"{name}\n%F\t" + "\t".join(labels), columnar)
+        table._length = len(columns[0]) if columns else 0
+        if columnar:
+            table._columns = {
+                label: _compact_column(label, list(values))
+                for label, values in zip(labels, columns)
+            }
+        else:
+            table._rows = list(map(list, zip(*columns)))
+        return table
 
     def __bool___(self) -> bool:
         return len(self.rows) > 0
 
     def __getitem__(self, _key):
         if isinstance(_key, (int, slice)):
-            return self.rows[_key]
+            if self._columns is None:
+                return self.rows[_key]
+            if isinstance(_key, int):
+                return [
+                    _cell_text(label, col[_key]) for label, col in self._columns.items()
+                ]
+            return [
+                list(row)
+                for row in zip(
+                    *(
+                        _column_text(label, col[_key])
+                        for label, col in self._columns.items()
+                    )
+                )
+            ]
 
         if isinstance(_key, str):
-            if _key not in self.labels:
-                raise KeyError(f"{_key} not found")
-
-            return [row[_key] for row in self.entries()]
+            return self.column(_key)
 
         if isinstance(_key, (list, tuple, set)):
             for k in _key:
                 if k not in self.labels:
                     raise KeyError("{k} not found")
 
-            return [{k: row[k] for k in _key} for row in self.entries()]
+            columns = [self.column(k) for k in _key]
+            return [dict(zip(_key, values)) for values in zip(*columns)]
 
     def __len__(self) -> int:
-        return len(self.rows)
+        return self._length
 
     def __str__(self) -> str:
         return self.name
 
+    @property
+    def columnar(self) -> bool:
+        """Data is stored by column rather than by row"""
+        return self._columns is not None
+
+    @property
+    def rows(self) -> list[list[str]]:
+        """Nested Array containing Rows of Data.
+        Rebuilt from the columns on every access if the table is columnar."""
+        if self._rows is not None:
+            return self._rows
+        return [list(row) for row in self._iter_rows()]
+
+    def column(self, label: str, serialize: bool = False) -> list:
+        """Get the converted values of a single column without building the entries.
+
+        Args:
+            label (str): column label
+            serialize (bool, optional): keep dates as strings. [Default is False]
+
+        Returns:
+            list: column values
+        """
+        if (typed := self._typed_column(label)) is not None:
+            return _typed_values(label, typed, serialize)
+
+        return list(map(get_converter(label, serialize), self.raw_column(label)))
+
+    def get(self, key_value: Any, default: Any = None) -> XerRow | Any:
+        """Get a row by the value of its unique key.
+        The key index is built on first use.
+
+        Args:
+            key_value (Any): value of the key column. Text values are converted
+                to the data type of the key column.
+            default (Any, optional): returned if no row is found. [Default is None]
+
+        Raises:
+            ValueError: table does not have a unique key
+
+        Returns:
+            XerRow | Any: row view or default
+        """
+        if not self.key:
+            raise ValueError(f"Table {self.name} does not have a unique key")
+
+        if self._key_index is None:
+            self._key_index = dict(zip(self.column(self.key), self.records()))
+
+        if isinstance(key_value, str):
+            key_value = get_converter(self.key)(key_value)
+        return self._key_index.get(key_value, default)
+
+    def index_by(self, label: str) -> dict[Any, list[XerRow]]:
+        """Group the rows by the values of a column, such as a foreign key.
+        The index is built on first use and cached.
+
+        Args:
+            label (str): column label
+
+        Returns:
+            dict[Any, list[XerRow]]: column value mapped to the rows having that value
+        """
+        if label not in self._indexes:
+            index: dict[Any, list[XerRow]] = {}
+            for value, row in zip(self.column(label), self.records()):
+                index.setdefault(value, []).append(row)
+            self._indexes[label] = index
+        return self._indexes[label]
+
+    def raw_column(self, label: str) -> list[str]:
+        """Get the unconverted text values of a single column.
+
+        Args:
+            label (str): column label
+
+        Returns:
+            list[str]: column values
+        """
+        if label not in self.labels:
+            raise KeyError(f"{label} not found")
+
+        if self._columns is not None:
+            values = self._columns[label]
+            return (
+                list(_column_text(label, values))
+                if isinstance(values, array)
+                else values
+            )
+
+        col = self.labels.index(label)
+        return [row[col] if col < len(row) else "" for row in self._rows]
+
     def entries(self, serialize: bool = False) -> list[dict[str, str]]:
         if not self._entries or serialize != self._serialized:
-            self._entries = [
-                _converter(serialize, **dict(zip(self.labels, row)))
-                for row in self.rows
-            ]
+            start = perf_counter()
+            # Convert whole columns at once, then zip them back into rows
+            columns = [self.column(label, serialize) for label in self.labels]
+            self._entries = [dict(zip(self.labels, values)) for values in zip(*columns)]
+            if self.observer:
+                self.observer(
+                    StageEvent(
+                        "convert",
+                        perf_counter() - start,
+                        self.name,
+                        row_count=self._length,
+                    )
+                )
         self._serialized = serialize
         return self._entries
 
+    def records(self, serialize: bool = False) -> Iterator[XerRow]:
+        """
+        Iterate over the rows as lightweight `XerRow` views.
+        Unlike `entries`, values are only converted when they are read.
+
+        Args:
+            serialize (bool, optional): keep dates as strings. [Default is False]
+
+        Yields:
+            XerRow: view of a single row
+        """
+        schema = {
+            label: (col, get_converter(label, serialize))
+            for col, label in enumerate(self.labels)
+        }
+        return (XerRow(schema, values) for values in self._iter_rows())
+
+    def to_dataframe(self) -> "pd.DataFrame":
+        """
+        Convert the table to a pandas DataFrame, built column by column.
+        Column data types are inferred from the column labels. Requires `pandas`.
+
+        Returns:
+            pd.DataFrame: DataFrame with a column for each label
+        """
+        # Imported here to avoid a circular import with the dataframe module
+        from xer_reader.src.dataframe import table_to_dataframe
+
+        return table_to_dataframe(self)
+
+    def _typed_column(self, label: str) -> array | None:
+        """Get a column stored in a typed array, or None if it is stored as text"""
+        if self._columns is not None and isinstance(
+            typed := self._columns.get(label), array
+        ):
+            return typed
+        return None
+
+    def _iter_rows(self) -> Iterator[Sequence[str]]:
+        if self._columns is None:
+            return iter(self._rows)
+        return zip(*(_column_text(label, col) for label, col in self._columns.items()))
+
+
+def _cell_text(label: str, value: str | int | float) -> str:
+    if isinstance(value, str):
+        return value
+    return _TEXT[column_type(label)](value)
+
 
-def _converter(
-    serialize: bool, **kwargs: str
-) -> dict[str, None | int | float | datetime | bool]:
+def _column_text(label: str, values: Sequence) -> Iterable[str]:
+    """Text of the stored values of a column, as written in the XER file"""
+    if isinstance(values, array):
+        return map(_TEXT[column_type(label)], values)
+    return values
+
+
+def _compact_column(label: str, values: list[str]) -> Sequence:
+    """Store a column in a typed `array` when every value can be restored exactly,
+    otherwise as a list sharing one string object per distinct value.
+    Empty values are stored as `MISSING_INT`, or NaN in float columns, and dates
+    as minutes since 1970."""
+    data_type = column_type(label)
+    typed = None
+    if data_type == "int":
+        try:
+            typed = array(
+                "q", [MISSING_INT if val == "" else int(val) for val in values]
+            )
+        except (ValueError, OverflowError):
+            pass
+    elif data_type == "float":
+        try:
+            typed = array("d", [NAN if val == "" else float(val) for val in values])
+        except ValueError:
+            pass
+    elif data_type == "date" and (typed := _date_minutes(values)) is not None:
+        return typed
+    if typed is not None and list(_column_text(label, typed)) == values:
+        return typed
+
+    distinct: dict[str, str] = {}
+    return [distinct.setdefault(val, val) for val in values]
+
+
+def _date_minutes(values: list[str]) -> array | None:
+    """Store dates as minutes since 1970, or None if a value can not be
+    restored exactly. Each distinct value is only converted once."""
+    minutes = {"": MISSING_INT}
+    for value in dict.fromkeys(values):
+        if value in minutes:
+            continue
+        try:
+            minutes[value] = (_parse_date(value) - EPOCH) // MINUTE
+        except ValueError:
+            return None
+        if _minutes_text(minutes[value]) != value:
+            return None
+    return array("q", map(minutes.__getitem__, values))
+
+
+def _filter_lines(
+    lines: list[str],
+    labels: list[str],
+    where: dict[str, Any],
+    predicate: Callable[[XerRow], bool] | None,
+) -> list[str]:
+    """Keep the rows matching every `where` condition and the predicate.
+    `labels` includes the `%F` field, so label positions match the line fields."""
+    positions = {label: col for col, label in enumerate(labels) if col}
+    conditions = []
+    for label, value in where.items():
+        if label not in positions:
+            raise KeyError(f"{label} not found")
+        conditions.append((positions[label], _where_values(value)))
+
+    # Most rows are rejected by a substring search for the field values,
+    # so only rows that might match are split. Missing fields of short rows
+    # are empty, so empty values are only checked after splitting.
+    for _, values in conditions:
+        if "" not in values:
+            lines = _find_fields(lines, values)
+
+    schema = {label: (col, get_converter(label)) for label, col in positions.items()}
+    # Without a predicate, fields after the last condition are left unsplit
+    width = len(labels) if predicate else max(col for col, _ in conditions) + 1
+    padding = [""] * width
+    kept = []
+    for line in lines:
+        fields = line.split("\t", width)
+        if len(fields) < width:
+            fields += padding
+        if all(fields[col] in values for col, values in conditions) and (
+            predicate is None or predicate(XerRow(schema, fields))
+        ):
+            kept.append(line)
+    return kept
+
+
+def _find_fields(lines: list[str], values: frozenset[str]) -> list[str]:
+    """Keep the lines containing one of the values as a whole field after the first"""
+    fields = tuple(f"\t{value}\t" for value in values)
+    ends = tuple(f"\t{value}" for value in values)
+    if len(fields) == 1:
+        field = fields[0]
+        return [line for line in lines if field in line or line.endswith(ends)]
+    return [
+        line
+        for line in lines
+        if any(field in line for field in fields) or line.endswith(ends)
+    ]
+
+
+def _float_text(value: float) -> str:
+    text = repr(value)
+    return text[:-2] if text.endswith(".0") else text
+
+
+def _float_cell_text(value: float) -> str:
+    return "" if value != value else _float_text(value)
+
+
+def _int_text(value: int) -> str:
+    return "" if value == MISSING_INT else str(value)
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _minutes_date(value: int) -> datetime:
+    return EPOCH + timedelta(minutes=value)
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _minutes_text(value: int) -> str:
+    if value == MISSING_INT:
+        return ""
+    return _minutes_date(value).isoformat(" ", "minutes")
+
+
+def _typed_values(label: str, typed: array, serialize: bool) -> list:
+    """Converted values of a column stored in a typed array"""
+    data_type = column_type(label)
+    if data_type == "float":
+        return [None if val != val else val for val in typed]
+    if data_type == "date":
+        convert = _minutes_text if serialize else _minutes_date
+        return [None if val == MISSING_INT else convert(val) for val in typed]
+    return [None if val == MISSING_INT else val for val in typed]
+
+
+def project_rows(lines: list[str], cols: list[int]) -> list[list[str]]:
+    """Split rows, keeping only the fields at the `cols` positions.
+
+    Args:
+        lines (list[str]): `%R` lines of a table
+        cols (list[int]): positions of the fields to keep, counting the `%R` field
+
+    Returns:
+        list[list[str]]: selected fields of each row, with missing fields empty
+    """
+    if not cols:
+        return [[] for _ in lines]
+    # Fields after the last selected column are left unsplit
+    width = max(cols) + 1
+    padding = [""] * width
+    if len(cols) == 1:
+        return [[(line.split("\t", width) + padding)[cols[0]]] for line in lines]
+
+    get = itemgetter(*cols)
+    rows = []
+    for line in lines:
+        fields = line.split("\t", width)
+        if len(fields) < width:
+            fields += padding
+        rows.append(list(get(fields)))
+    return rows
+
+
+def _to_columns(
+    labels: list[str], lines: list[str], width: int, cols: list[int]
+) -> dict[str, Sequence]:
+    """Split rows into columns, keeping only the columns at the `cols` positions.
+    `width` is the number of fields in a complete row, including the `%R` field."""
+    fields = "\t".join(lines).split("\t") if lines else []
+    if len(fields) != width * len(lines) or fields[::width].count("%R") != len(lines):
+        # Some rows are short or long, so pad or trim each row to the labels
+        fields = [
+            field
+            for line in lines
+            for field in (line.split("\t") + [""] * width)[:width]
+        ]
+
+    # Every row has the same width, so each column is a stride of the fields
     return {
-        label: _convert_entry_data_type(label, value, serialize)
-        for label, value in kwargs.items()
+        label: _compact_column(label, fields[col::width])
+        for col, label in zip(cols, labels)
     }
 
 
+Converter = Callable[[str], None | int | float | datetime | bool | str]
+
+
+def column_type(label: str) -> str:
+    """Get the data type of a column, determined from its label.
+
+    Args:
+        label (str): column label
+
+    Returns:
+        str: one of "int", "float", "date", "flag" or "str"
+    """
+    if _is_int_label(label):
+        return "int"
+    if _is_float_label(label):
+        return "float"
+    if _is_date_label(label):
+        return "date"
+    if label.endswith("_flag"):
+        return "flag"
+    return "str"
+
+
+def get_converter(label: str, serialize: bool = False) -> Converter:
+    """Get the function that converts the text values of a column to its data type.
+    The data type is determined once from the column label.
+
+    Args:
+        label (str): column label
+        serialize (bool, optional): keep dates as strings. [Default is False]
+
+    Returns:
+        Converter: function converting a single text value
+    """
+    data_type = column_type(label)
+    if serialize and data_type == "date":
+        return _to_str
+    return _CONVERTERS[data_type]
+
+
 def _is_date_label(label: str) -> bool:
     return label.endswith(("_date", "_date2"))
 
@@ -113,21 +609,86 @@ def _is_int_label(label: str) -> bool:
 def _convert_entry_data_type(
     label: str, value: str, serialize: bool
 ) -> None | int | float | datetime | bool:
-    if value == "":
-        return None
-    if _is_int_label(label):
-        try:
-            return int(value)
-        except ValueError:
-            return value
-    if _is_float_label(label):
+    return get_converter(label, serialize)(value)
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _parse_date(value: str) -> datetime:
+    # fromisoformat is much faster than strptime but accepts more formats,
+    # so only use it for values that match DATE_HR_FORMAT exactly
+    if len(value) == 16 and value[10] == " ":
         try:
-            return float(value.replace(",", "."))
+            return datetime.fromisoformat(value)
         except ValueError:
-            return value
-    if not serialize and _is_date_label(label):
-        return datetime.strptime(value, DATE_HR_FORMAT)
-    if label.endswith("_flag"):
-        return value == "Y"
+            pass
+    return datetime.strptime(value, DATE_HR_FORMAT)
+
+
+def _to_bool(value: str) -> bool | None:
+    if value == "":
+        return None
+    return value == "Y"
+
+
+def _to_date(value: str) -> datetime | None:
+    if value == "":
+        return None
+    return _parse_date(value)
+
+
+def _to_float(value: str) -> float | str | None:
+    if value == "":
+        return None
+    try:
+        return float(value.replace(",", "."))
+    except ValueError:
+        return value
 
+
+def _to_int(value: str) -> int | str | None:
+    if value == "":
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+def _to_str(value: str) -> str | None:
+    if value == "":
+        return None
     return value
+
+
+def _where_text(value: Any) -> str:
+    """Format a `where` value as it is written in an XER file"""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "Y" if value else "N"
+    if isinstance(value, float):
+        return _float_text(value)
+    if isinstance(value, datetime):
+        return value.strftime(DATE_HR_FORMAT)
+    return str(value)
+
+
+def _where_values(value: Any) -> frozenset[str]:
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return frozenset(map(_where_text, value))
+    return frozenset((_where_text(value),))
+
+
+_TEXT: dict[str, Callable[[Any], str]] = {
+    "int": _int_text,
+    "float": _float_cell_text,
+    "date": _minutes_text,
+}
+
+_CONVERTERS: dict[str, Converter] = {
+    "int": _to_int,
+    "float": _to_float,
+    "date": _to_date,
+    "flag": _to_bool,
+    "str": _to_str,
+}